@@ -23,9 +23,8 @@ from simpleNMRbrukerTools import gui
 from simpleNMRbrukerTools import parsers
 from simpleNMRbrukerTools import utils
 
-from simpleNMRbrukerTools.core.json_converter import BrukerToJSONConverter
-from simpleNMRbrukerTools.core.data_reader import BrukerDataDirectory  
-from simpleNMRbrukerTools.config import EXPERIMENT_CONFIGS
+# The converter/data reader (and with them pandas, numpy and RDKit) are not
+# needed to install the Topspin files, so they are not imported here
 
 def setup_topspin():
 
@@ -1,12 +1,107 @@
 """
 bruker_nmr/src/core/data_reader.py
 """
+import os
+import hashlib
+import functools
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, List, Union, Any
+from typing import Dict, List, Optional, Tuple, Union, Any
 from ..parsers.parameter_parser import BrukerParameterFile
 from ..parsers.peak_parser import parse_peak_xml
 from ..parsers.integral_parser import parse_bruker_2d_integral
 
+# Reading experiments is dominated by waiting on file I/O, so use more threads
+# than the ThreadPoolExecutor default (cpu_count + 4)
+_MAX_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+# Bruker acquisition and processing parameter files for up to 8 dimensions:
+# acqu/acqus, acqu2/acqu2s, ... and proc/procs, proc2/proc2s, ...
+_DIMENSION_SUFFIXES = ('', '2', '3', '4', '5', '6', '7', '8')
+_ACQU_NAMES = frozenset(f'acqu{dim}{status}' for dim in _DIMENSION_SUFFIXES for status in ('', 's'))
+_PROC_NAMES = frozenset(f'proc{dim}{status}' for dim in _DIMENSION_SUFFIXES for status in ('', 's'))
+
+# Files in a proc folder that hold the peak list and the 2D integrals
+_PEAK_INTEGRAL_FILES = frozenset(('peaklist.xml', 'int2d'))
+
+
+# Parsed parameters of recently read parameter files, keyed by (path, mtime_ns, size)
+# so a file that changes on disk is parsed again rather than served from the cache.
+# Only copies of the cached parameters are handed out (BrukerParameterFile.from_parameters).
+_PARAMETER_CACHE_SIZE = 4096
+_parameter_cache: 'OrderedDict[Tuple[str, int, int], Dict[str, Any]]' = OrderedDict()
+_parameter_cache_lock = threading.Lock()
+
+
+def _get_cached_parameters(key: Tuple[str, int, int]) -> Optional[Dict[str, Any]]:
+    """Get the cached parameters for a (path, mtime_ns, size) key, or None."""
+    with _parameter_cache_lock:
+        parameters = _parameter_cache.get(key)
+        if parameters is not None:
+            _parameter_cache.move_to_end(key)
+        return parameters
+
+
+def _cache_parameters(key: Tuple[str, int, int], parameters: Dict[str, Any]) -> None:
+    """Cache parsed parameters, evicting the least recently used entry when full."""
+    with _parameter_cache_lock:
+        _parameter_cache[key] = parameters
+        _parameter_cache.move_to_end(key)
+        if len(_parameter_cache) > _PARAMETER_CACHE_SIZE:
+            _parameter_cache.popitem(last=False)
+
+
+class _LazyParameterFile:
+    """
+    Stands in for a BrukerParameterFile until one of its parameters is read.
+    
+    Most acqu*/proc* files (acquNs, procs, ...) are never looked at after the
+    scan, so they are only parsed on first access. Errors reading the file are
+    raised at that point rather than during the scan.
+    
+    Attributes:
+        file_path (Path): Path to the parameter file
+    """
+    
+    def __init__(self, file_path: Path, parsed_by_content: Dict[bytes, Dict[str, Any]]):
+        self.file_path = file_path
+        self._parsed_by_content = parsed_by_content
+    
+    @functools.cached_property
+    def _parsed(self) -> BrukerParameterFile:
+        parsed = BrukerDataDirectory._read_parameter_file(self.file_path, self._parsed_by_content)
+        # Parsed now, so stop holding on to the folder's shared parameters
+        self._parsed_by_content = None
+        return parsed
+    
+    @property
+    def parameters(self) -> Dict[str, Any]:
+        """Parsed parameters."""
+        return self._parsed.parameters
+    
+    @property
+    def raw_content(self) -> str:
+        """Raw file content."""
+        return self._parsed.raw_content
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Get parameter value with default."""
+        return self.parameters.get(key, default)
+    
+    def __getitem__(self, key: str) -> Any:
+        """Get parameter value."""
+        return self.parameters[key]
+    
+    def __contains__(self, key: str) -> bool:
+        """Check if parameter exists."""
+        return key in self.parameters
+    
+    def keys(self):
+        """Get parameter keys."""
+        return self.parameters.keys()
+
 
 class BrukerDataDirectory:
     """
@@ -15,7 +110,12 @@ class BrukerDataDirectory:
     Attributes:
         path (Path): Path to the data directory
         experiments (Dict): Dictionary of experiment configurations
-        data (Dict): Parsed experiment data
+        data (Dict): Parsed experiment data, with every experiment loaded
+    
+    Only the folder listings are read on construction. get() and [] read a
+    single experiment's parameters, peak lists and integrals on first access;
+    data, values() and items() read every experiment. keys(), in and len()
+    never read an experiment.
     """
     
     def __init__(self, path: Union[str, Path], experiment_configs: Dict[str, Dict]):
@@ -28,56 +128,166 @@ class BrukerDataDirectory:
         """
         self.path = Path(path)
         self.experiment_configs = experiment_configs
-        self.data = {}
+        self._experiment_index = self._build_experiment_index(experiment_configs)
+        # Experiment folders in directory order; _data holds None until one is read
+        self._folders = {}
+        self._data = {}
+        self._loaded = set()
+        # Which of peaklist.xml/int2d each proc folder listing contained
+        self._peak_integral_files = {}
+        # Progress and error messages, printed together once a load finishes
+        self._messages = []
         
         self._scan_directory()
-        self._identify_experiments()
+    
+    @property
+    def data(self) -> Dict[str, Dict]:
+        """Parsed experiment data, with every experiment loaded."""
+        self.load_all()
+        return self._data
+    
+    def load_all(self) -> None:
+        """Read every experiment not loaded yet, with its peak lists and integrals."""
+        pending = [expt_id for expt_id, expt_data in self._data.items() if expt_data is None]
+        if pending:
+            # Experiment folders are independent and reading them is mostly file I/O,
+            # so they are read concurrently; results are stored in directory order
+            with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+                expt_entries = list(executor.map(self._read_experiment, pending))
+            
+            for expt_id, expt_data in zip(pending, expt_entries):
+                self._data[expt_id] = expt_data
+            self._identify_experiments(pending)
+        
         self._process_peaks_and_integrals()
+        self._print_messages()
+    
+    def _ensure_loaded(self, expt_id: str) -> None:
+        """Read a single experiment, with its peak lists and integrals, on first access."""
+        if self._data[expt_id] is None:
+            self._data[expt_id] = self._read_experiment(expt_id)
+            self._identify_experiments([expt_id])
+        self._ensure_peaks_and_integrals(expt_id)
+        self._print_messages()
+    
+    def _print_messages(self) -> None:
+        """Print the collected messages in one write."""
+        # Worker threads only append, so messages never interleave mid-line
+        if self._messages:
+            messages, self._messages = self._messages, []
+            print('\n'.join(messages))
+    
+    def _read_experiment(self, expt_id: str) -> Dict:
+        """Parse the parameter files of a scanned experiment folder."""
+        return self._process_experiment_folder(*self._folders[expt_id])
     
     def _scan_directory(self) -> None:
         """Scan directory for Bruker experiment folders."""
-        for folder in self.path.glob('*'):
-            if folder.is_dir():
-                acqu_files = list(folder.glob('acqu*'))
-                if acqu_files:
-                    self._process_experiment_folder(folder, acqu_files)
+        # Keep the DirEntry objects; a Path is only built for folders that turn
+        # out to be experiments
+        try:
+            with os.scandir(self.path) as entries:
+                folders = [entry for entry in entries if entry.is_dir()]
+        except OSError:
+            folders = []
+        
+        # Only the folder listings are read here, concurrently; parsing waits
+        # until an experiment is accessed
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+            listings = list(executor.map(self._list_experiment_folder, folders))
+        
+        for folder, listing in zip(folders, listings):
+            if listing is not None:
+                self._folders[folder.name] = listing
+                self._data[folder.name] = None
+    
+    def _list_experiment_folder(self, folder: os.DirEntry) -> Optional[Tuple[Path, List[Path], Optional[Path]]]:
+        """
+        List a folder if it is a Bruker experiment (has acqu* files).
+        
+        Returns:
+            (folder, acqu files, pdata directory or None), or None if the folder
+            is not an experiment
+        """
+        # One listing finds both the acqu* files and the pdata directory
+        acqu_files = []
+        pdata_dir = None
+        try:
+            with os.scandir(folder.path) as entries:
+                for entry in entries:
+                    if entry.name in _ACQU_NAMES:
+                        if entry.is_file():
+                            acqu_files.append(Path(entry.path))
+                    elif entry.name == 'pdata' and entry.is_dir():
+                        pdata_dir = Path(entry.path)
+        except OSError:
+            return None
+        
+        if not acqu_files:
+            return None
+        return Path(folder.path), acqu_files, pdata_dir
     
-    def _process_experiment_folder(self, folder: Path, acqu_files: List[Path]) -> None:
-        """Process a single experiment folder."""
-        expt_id = folder.name
+    @staticmethod
+    def _list_entries(directory: Path, predicate) -> List[Path]:
+        """
+        List the entries of a directory that satisfy predicate.
+        
+        Uses os.scandir so the file type checks in predicate come from the
+        directory listing itself rather than a stat call per entry.
         
-        self.data[expt_id] = {
+        Args:
+            directory: Directory to list
+            predicate: Function taking an os.DirEntry and returning True to keep it
+            
+        Returns:
+            Paths of the matching entries, or an empty list if the directory can't be read
+        """
+        try:
+            with os.scandir(directory) as entries:
+                return [Path(entry.path) for entry in entries if predicate(entry)]
+        except OSError:
+            return []
+    
+    def _process_experiment_folder(self, folder: Path, acqu_files: List[Path],
+                                   pdata_dir: Optional[Path]) -> Dict:
+        """Process a single experiment folder and return its data entry."""
+        # One dimension per acquN file, whether the acquN and/or acquNs variant is present
+        acqu_names = [acqu_file.name for acqu_file in acqu_files]
+        dimensions = len({name[:-1] if name.endswith('s') else name for name in acqu_names})
+        expt_data = {
             'path': folder,
-            'dimensions': len(acqu_files) // 2,
+            'dimensions': dimensions,
             'acqu_files': acqu_files
         }
         
-        # Parse acquisition files
-        for acqu_file in acqu_files:
+        # Parse the acquisition files needed for the metadata now; the rest on first use
+        parsed_by_content = {}
+        for acqu_file, name in zip(acqu_files, acqu_names):
+            if name not in ('acqu', 'acqu2'):
+                expt_data[name] = _LazyParameterFile(acqu_file, parsed_by_content)
+                continue
             try:
-                self.data[expt_id][acqu_file.name] = BrukerParameterFile(acqu_file)
+                expt_data[name] = self._read_parameter_file(acqu_file, parsed_by_content)
             except Exception as e:
-                print(f"Error reading {acqu_file}: {e}")
+                self._messages.append(f"Error reading {acqu_file}: {e}")
         
         # Add pulse program and nuclei info
-        self._add_experiment_metadata(expt_id)
+        self._add_experiment_metadata(expt_data)
         
         # Find and process pdata
-        self._process_pdata(expt_id, folder)
+        self._process_pdata(expt_data, pdata_dir)
+        
+        return expt_data
     
-    def _add_experiment_metadata(self, expt_id: str) -> None:
+    def _add_experiment_metadata(self, expt_data: Dict) -> None:
         """Add pulse program and nuclei information."""
-        expt_data = self.data[expt_id]
+        acqu = expt_data.get('acqu')
         
         # Pulse program
-        if 'acqu' in expt_data:
-            expt_data['pulseprogram'] = expt_data['acqu'].get('PULPROG', 'Unknown')
-        else:
-            expt_data['pulseprogram'] = 'Unknown'
+        expt_data['pulseprogram'] = acqu.get('PULPROG', 'Unknown') if acqu is not None else 'Unknown'
         
         # Nuclei
-        if 'acqu' in expt_data:
-            acqu = expt_data['acqu']
+        if acqu is not None:
             acqu2 = expt_data.get('acqu2', {})
             
             if expt_data['dimensions'] == 1:
@@ -89,92 +299,184 @@ class BrukerDataDirectory:
         else:
             expt_data['nuclei'] = ['Unknown']
     
-    def _process_pdata(self, expt_id: str, folder: Path) -> None:
-        """Process processed data directories."""
-        pdata_dir = folder / 'pdata'
-        if not pdata_dir.is_dir():
-            self.data[expt_id]['pdata'] = {'procfolders': []}
+    def _process_pdata(self, expt_data: Dict, pdata_dir: Optional[Path]) -> None:
+        """Process processed data directories (pdata_dir is None if there is none)."""
+        if pdata_dir is None:
+            expt_data['pdata'] = {'procfolders': []}
             return
         
-        proc_folders = [f for f in pdata_dir.glob('*') if f.is_dir() and f.name.isdigit()]
-        self.data[expt_id]['pdata'] = {
+        proc_folders = self._list_entries(pdata_dir, lambda entry: entry.name.isdigit() and entry.is_dir())
+        expt_data['pdata'] = {
             'path': pdata_dir,
             'procfolders': proc_folders
         }
         
         # Process each proc folder
         for proc_folder in proc_folders:
-            self._process_proc_folder(expt_id, proc_folder)
+            self._process_proc_folder(expt_data, proc_folder)
     
-    def _process_proc_folder(self, expt_id: str, proc_folder: Path) -> None:
+    def _process_proc_folder(self, expt_data: Dict, proc_folder: Path) -> None:
         """Process a single processed data folder."""
+        # One listing finds the proc* files and notes any peak list/integral file
+        proc_files = []
+        present = set()
+        try:
+            with os.scandir(proc_folder) as entries:
+                for entry in entries:
+                    if entry.name in _PROC_NAMES:
+                        if entry.is_file():
+                            proc_files.append(Path(entry.path))
+                    elif entry.name in _PEAK_INTEGRAL_FILES:
+                        present.add(entry.name)
+        except OSError:
+            pass
+        self._peak_integral_files[proc_folder] = present
+        
         proc_data = {
             'path': proc_folder,
-            'proc_files': list(proc_folder.glob('proc*'))
+            'proc_files': proc_files
         }
         
-        # Parse proc files
+        # Proc files are parsed on first use
+        parsed_by_content = {}
         for proc_file in proc_data['proc_files']:
-            try:
-                proc_data[proc_file.name] = BrukerParameterFile(proc_file)
-            except Exception as e:
-                print(f"Error reading {proc_file}: {e}")
+            proc_data[proc_file.name] = _LazyParameterFile(proc_file, parsed_by_content)
         
-        self.data[expt_id]['pdata'][proc_folder.name] = proc_data
+        expt_data['pdata'][proc_folder.name] = proc_data
     
-    def _identify_experiments(self) -> None:
-        """Identify experiment types based on configuration."""
-        for expt_id, expt_data in self.data.items():
-            matched = False
+    @staticmethod
+    def _read_parameter_file(file_path: Path, parsed_by_content: Dict[bytes, Dict[str, Any]]) -> BrukerParameterFile:
+        """
+        Parse a parameter file, reusing an earlier file with the same parameter content.
+        
+        An acquN/acquNs (or procN/procNs) pair usually differs only in its $$
+        comment lines, which the parser skips, so the second file of the pair
+        shares the parameters already parsed for the first.
+        
+        Args:
+            file_path: Parameter file to read
+            parsed_by_content: Parameters already parsed in this folder, keyed by a
+                digest of the file content
+            
+        Returns:
+            BrukerParameterFile for file_path, with its own copy of the parameters
+        """
+        # Files unchanged since they were last read come straight from the cache
+        stat = os.stat(file_path)
+        cache_key = (str(file_path), stat.st_mtime_ns, stat.st_size)
+        parameters = _get_cached_parameters(cache_key)
+        
+        if parameters is None:
+            with open(file_path, 'rb') as f:
+                content = f.read()
+            # $$ lines are skipped but still end an array value, so keep their position
+            masked = b'\n'.join(b'$$' if line.lstrip().startswith(b'$$') else line
+                                 for line in content.splitlines())
+            content_key = hashlib.blake2b(masked, digest_size=16).digest()
             
-            for exp_type, exp_config in self.experiment_configs.items():
-                if self._matches_experiment_config(expt_data, exp_config):
-                    expt_data['experimentType'] = exp_type
-                    matched = True
-                    print(f"Experiment {expt_id} identified as {exp_type}")
-                    break
+            parameters = parsed_by_content.get(content_key)
+            if parameters is None:
+                parameters = BrukerParameterFile(file_path, content=content).parameters
+                parsed_by_content[content_key] = parameters
+            _cache_parameters(cache_key, parameters)
+        
+        return BrukerParameterFile.from_parameters(file_path, parameters)
+    
+    def _identify_experiments(self, expt_ids: List[str]) -> None:
+        """Identify the experiment types of newly read experiments based on configuration."""
+        for expt_id in expt_ids:
+            expt_data = self._data[expt_id]
+            key = (expt_data['pulseprogram'], frozenset(expt_data['nuclei']), expt_data['dimensions'])
+            exp_type = self._experiment_index.get(key)
             
-            if not matched:
+            if exp_type is not None:
+                expt_data['experimentType'] = exp_type
+                self._messages.append(f"Experiment {expt_id} identified as {exp_type}")
+            else:
                 expt_data['experimentType'] = 'Unknown'
-                print(f"Experiment {expt_id} ({expt_data['pulseprogram']}) not recognized")
+                self._messages.append(f"Experiment {expt_id} ({expt_data['pulseprogram']}) not recognized")
     
-    def _matches_experiment_config(self, expt_data: Dict, config: Dict) -> bool:
-        """Check if experiment matches configuration."""
-        return (expt_data['pulseprogram'] in config['pulseprogram'] and
-                set(expt_data['nuclei']) == set(config['nuclei']) and
-                expt_data['dimensions'] == config['dimensions'])
+    @staticmethod
+    def _build_experiment_index(experiment_configs: Dict[str, Dict]) -> Dict[tuple, str]:
+        """
+        Build a lookup from (pulse program, nuclei, dimensions) to experiment type.
+        
+        Where a pulse program appears in more than one configuration with the same
+        nuclei and dimensions, the first configuration wins, as it did when the
+        configurations were checked in order.
+        
+        Args:
+            experiment_configs: Dictionary defining experiment types and parameters
+            
+        Returns:
+            Dictionary keyed by (pulseprogram, frozenset of nuclei, dimensions)
+        """
+        index = {}
+        for exp_type, exp_config in experiment_configs.items():
+            nuclei = frozenset(exp_config['nuclei'])
+            for pulseprogram in exp_config['pulseprogram']:
+                index.setdefault((pulseprogram, nuclei, exp_config['dimensions']), exp_type)
+        return index
     
     def _process_peaks_and_integrals(self) -> None:
-        """Process peak lists and integrals for all experiments."""
-        for expt_id, expt_data in self.data.items():
-            self._process_experiment_peaks(expt_id, expt_data)
-            if expt_data['dimensions'] == 2:
-                self._process_experiment_integrals(expt_id, expt_data)
+        """Process peak lists and integrals for all experiments not loaded yet (all must have been read)."""
+        pending = [expt_id for expt_id in self._data if expt_id not in self._loaded]
+        if not pending:
+            return
+        
+        # Each experiment only updates its own entry, so they can be read concurrently
+        with ThreadPoolExecutor(max_workers=_MAX_WORKERS) as executor:
+            list(executor.map(self._ensure_peaks_and_integrals, pending))
+    
+    def _ensure_peaks_and_integrals(self, expt_id: str) -> None:
+        """Load the peak lists and integrals of an experiment on first access."""
+        if expt_id in self._loaded:
+            return
+        self._process_experiment_peaks_and_integrals(expt_id, self._data[expt_id])
+        self._loaded.add(expt_id)
+    
+    def _process_experiment_peaks_and_integrals(self, expt_id: str, expt_data: Dict) -> None:
+        """Process the peak lists and, for 2D experiments, the integrals of one experiment."""
+        self._process_experiment_peaks(expt_id, expt_data)
+        if expt_data['dimensions'] == 2:
+            self._process_experiment_integrals(expt_id, expt_data)
     
     def _process_experiment_peaks(self, expt_id: str, expt_data: Dict) -> None:
         """Process peak lists for an experiment."""
         peak_type = self._get_peak_type(expt_data)
         
         for proc_folder in expt_data['pdata']['procfolders']:
-            peaklist_file = proc_folder / 'peaklist.xml'
-            if peaklist_file.exists():
-                try:
-                    with open(peaklist_file, 'r', encoding='utf-8') as f:
-                        xml_content = f.read()
-                    
-                    peak_df = parse_peak_xml(xml_content, peak_type)
-                    
-                    # Store peak data
-                    expt_data['peaklist'] = peak_df
-                    expt_data['pdata'][proc_folder.name]['peaklist'] = peak_df
-                    
-                    # Set has_peaks flag
-                    has_peaks = not peak_df.empty
-                    expt_data['haspeaks'] = has_peaks
-                    expt_data['pdata'][proc_folder.name]['haspeaks'] = has_peaks
-                    
-                except Exception as e:
-                    print(f"Error processing peaks for {expt_id}: {e}")
+            if 'peaklist.xml' not in self._peak_integral_files.get(proc_folder, _PEAK_INTEGRAL_FILES):
+                continue
+            peaklist_file = os.path.join(proc_folder, 'peaklist.xml')
+            try:
+                # The listing said the file is there; a missing file (removed
+                # since) just means this proc folder has no peak list
+                peaklist = open(peaklist_file, 'rb')
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            except Exception as e:
+                self._messages.append(f"Error processing peaks for {expt_id}: {e}")
+                continue
+            
+            try:
+                # The parser reads the binary file as it goes and decodes
+                # according to the XML declaration
+                with peaklist:
+                    peak_df = parse_peak_xml(peaklist, peak_type)
+                
+                # Store peak data
+                proc_data = expt_data['pdata'][proc_folder.name]
+                expt_data['peaklist'] = peak_df
+                proc_data['peaklist'] = peak_df
+                
+                # Set has_peaks flag
+                has_peaks = not peak_df.empty
+                expt_data['haspeaks'] = has_peaks
+                proc_data['haspeaks'] = has_peaks
+                
+            except Exception as e:
+                self._messages.append(f"Error processing peaks for {expt_id}: {e}")
     
     def _get_peak_type(self, expt_data: Dict) -> str:
         """Determine peak type based on experiment data."""
@@ -185,49 +487,68 @@ class BrukerDataDirectory:
     def _process_experiment_integrals(self, expt_id: str, expt_data: Dict) -> None:
         """Process 2D integrals for an experiment."""
         for proc_folder in expt_data['pdata']['procfolders']:
-            integral_file = proc_folder / 'int2d'
-            if integral_file.exists():
-                try:
-                    with open(integral_file, 'r', encoding='utf-8') as f:
-                        integral_content = f.read()
-                    
-                    integral_df = parse_bruker_2d_integral(integral_content)
-                    
-                    # Store integral data
-                    expt_data['pdata'][proc_folder.name]['integrals'] = integral_df
-                    
-                    # Set has_integrals flag
-                    has_integrals = not integral_df.empty
-                    expt_data['hasIntegrals'] = has_integrals
-                    expt_data['pdata'][proc_folder.name]['hasIntegrals'] = has_integrals
-                    
-                except Exception as e:
-                    print(f"Error processing integrals for {expt_id}: {e}")
+            if 'int2d' not in self._peak_integral_files.get(proc_folder, _PEAK_INTEGRAL_FILES):
+                continue
+            integral_file = os.path.join(proc_folder, 'int2d')
+            try:
+                # Decode the whole file at once; the parser splits lines and
+                # fields on whitespace, so no newline translation is needed
+                with open(integral_file, 'rb') as f:
+                    integral_content = f.read().decode('utf-8')
+            except (FileNotFoundError, NotADirectoryError):
+                continue
+            except Exception as e:
+                self._messages.append(f"Error processing integrals for {expt_id}: {e}")
+                continue
+            
+            try:
+                integral_df = parse_bruker_2d_integral(integral_content)
+                
+                # Store integral data
+                proc_data = expt_data['pdata'][proc_folder.name]
+                proc_data['integrals'] = integral_df
+                
+                # Set has_integrals flag
+                has_integrals = not integral_df.empty
+                expt_data['hasIntegrals'] = has_integrals
+                proc_data['hasIntegrals'] = has_integrals
+                
+            except Exception as e:
+                self._messages.append(f"Error processing integrals for {expt_id}: {e}")
     
     # Dictionary-like interface
     def get(self, expt_id: str, default: Any = None) -> Any:
         """Get experiment data with default."""
-        return self.data.get(expt_id, default)
+        if expt_id in self._data:
+            self._ensure_loaded(expt_id)
+        return self._data.get(expt_id, default)
     
     def __getitem__(self, expt_id: str) -> Any:
         """Get experiment data."""
-        return self.data[expt_id]
+        self._ensure_loaded(expt_id)
+        return self._data[expt_id]
     
     def __contains__(self, expt_id: str) -> bool:
         """Check if experiment exists."""
-        return expt_id in self.data
+        return expt_id in self._data
+    
+    def __len__(self) -> int:
+        """Get the number of experiments."""
+        return len(self._data)
     
     def keys(self):
         """Get experiment IDs."""
-        return self.data.keys()
+        return self._data.keys()
     
     def values(self):
         """Get experiment data values."""
-        return self.data.values()
+        self.load_all()
+        return self._data.values()
     
     def items(self):
         """Get experiment items."""
-        return self.data.items()
+        self.load_all()
+        return self._data.items()
     
 if __name__ == "__main__":
     pass
\ No newline at end of file
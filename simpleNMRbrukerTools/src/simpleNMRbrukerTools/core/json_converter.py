@@ -3,13 +3,16 @@ bruker_nmr/src/core/json_converter.py
 
 Complete BrukerToJSONConverter implementation - simplified and documented.
 """
+import os
 import json
 import uuid
-import socket
+from collections import Counter
 from pathlib import Path
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, NamedTuple, Optional, Any, Tuple, Union
 from datetime import datetime
 
+import numpy as np
+
 # Optional RDKit import
 try:
     from rdkit import Chem
@@ -18,9 +21,29 @@ try:
 except ImportError:
     RDKIT_AVAILABLE = False
 
+# Optional orjson import for faster JSON serialization
+try:
+    import orjson
+    ORJSON_AVAILABLE = True
+    # Accept non-string dict keys, which json.dumps converts to strings
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+except ImportError:
+    ORJSON_AVAILABLE = False
+
 from .data_reader import BrukerDataDirectory
 from ..config import EXPERIMENT_CONFIGS
 
+# Hardware (MAC address) based machine ID, used as the hostname sent to the server
+MACHINE_ID = hex(uuid.getnode())
+
+
+class _ExperimentSummary(NamedTuple):
+    """Experiment metadata shared by the spectrum and settings builders."""
+    nuclei: List[str]
+    dimensions: int
+    pulseprogram: str
+    exp_type: str
+
 
 class BrukerToJSONConverter:
     """
@@ -32,11 +55,12 @@ class BrukerToJSONConverter:
     
     Attributes:
         data_directory (Path): Path to the Bruker data directory
-        smiles (str): SMILES string for the molecule
-        molfile_content (str): Content of the mol file
+        smiles (str): SMILES string for the molecule, generated from the mol file
+            on first use if not given
+        molfile_content (str): Content of the mol file, read on first use if not given
         bruker_data (BrukerDataDirectory): Parsed Bruker data
         json_data (Dict): Output JSON structure
-        rdkit_mol: RDKit molecule object (if available)
+        rdkit_mol: RDKit molecule object (if available), loaded on first use
     """
     
     def __init__(self, data_directory: Union[str, Path], smiles: str = None, molfile_content: str = None):
@@ -49,50 +73,114 @@ class BrukerToJSONConverter:
             molfile_content: Optional mol file content as string
         """
         self.data_directory = Path(data_directory)
-        self.smiles = smiles
-        self.molfile_content = molfile_content
+        self._working_directory = self.data_directory.absolute().as_posix()
+        self._working_filename = self.data_directory.name
+        self._smiles = smiles
+        self._molfile_content = molfile_content
         
         # Molecular structure attributes
         self.mol_files = []
         self.selected_mol_file = None
-        self.rdkit_mol = None
+        self._rdkit_mol = None
+        self._atom_cache = None
         
         # Initialize the Bruker data reader
         self.bruker_data = BrukerDataDirectory(data_directory, EXPERIMENT_CONFIGS)
         
+        # Experiment summaries, peak experiment IDs and identifiers; collected from
+        # the Bruker data by _summarize_experiments() when converting, so the
+        # experiments are only read once they are needed
+        self._expt_summaries = {}
+        self._peak_expt_ids = []
+        self._exp_identifiers = []
+        
         # Initialize the JSON structure
         self.json_data = {}
         
-        # Process mol file if available and RDKit is installed
-        if RDKIT_AVAILABLE:
-            self._process_mol_files()
-
-        if self.rdkit_mol:
-            self.num_atoms = self.rdkit_mol.GetNumAtoms()
-            self.num_carbons = sum(1 for atom in self.rdkit_mol.GetAtoms() if atom.GetSymbol() == 'C')
-            self.num_CH3_groups = sum(1 for atom in self.rdkit_mol.GetAtoms() if atom.GetSymbol() == 'C' and atom.GetTotalNumHs() == 3)
-            self.num_CH2_groups = sum(1 for atom in self.rdkit_mol.GetAtoms() if atom.GetSymbol() == 'C' and atom.GetTotalNumHs() == 2)
-            self.num_CH1_groups = sum(1 for atom in self.rdkit_mol.GetAtoms() if atom.GetSymbol() == 'C' and atom.GetTotalNumHs() == 1)
-            self.num_CH0_groups = sum(1 for atom in self.rdkit_mol.GetAtoms() if atom.GetSymbol() == 'C' and atom.GetTotalNumHs() == 0)
-            for atom in self.rdkit_mol.GetAtoms():
-                if atom.GetSymbol() == 'C':
-                    print(atom.GetTotalNumHs())
-                    catom = atom
-
-            
-            print("dir(catom)")
-            print(dir(catom))
-        else:
-            self.num_atoms = 0
-            self.num_carbons = 0
-            self.num_CH3_groups = -1
-            self.num_CH2_groups = -1
-            self.num_CH1_groups = -1
-            self.num_CH0_groups = -1
-
-        print(f"Initialized BrukerToJSONConverter with {self.num_atoms} atoms, {self.num_carbons} carbons")
-        print(f"CH3 groups: {self.num_CH3_groups}, CH2 groups: {self.num_CH2_groups}, CH1 groups: {self.num_CH1_groups}, CH0 groups: {self.num_CH0_groups}")
-
+        # Mol files are found and loaded on first use (see _ensure_mol_files_processed)
+        self._mol_files_processed = False
+    
+    @property
+    def smiles(self) -> Optional[str]:
+        """SMILES string, generated from the directory's mol file if not given."""
+        self._ensure_mol_files_processed()
+        return self._smiles
+    
+    @smiles.setter
+    def smiles(self, smiles: Optional[str]) -> None:
+        self._smiles = smiles
+    
+    @property
+    def molfile_content(self) -> Optional[str]:
+        """Mol file content, read from the directory's mol file if not given."""
+        self._ensure_mol_files_processed()
+        return self._molfile_content
+    
+    @molfile_content.setter
+    def molfile_content(self, content: Optional[str]) -> None:
+        self._molfile_content = content
+    
+    @property
+    def rdkit_mol(self):
+        """RDKit molecule from the directory's mol file, or None."""
+        self._ensure_mol_files_processed()
+        return self._rdkit_mol
+    
+    @rdkit_mol.setter
+    def rdkit_mol(self, mol) -> None:
+        self._rdkit_mol = mol
+    
+    @property
+    def num_atoms(self) -> int:
+        """Number of atoms in the molecule, or 0 if no molecule is loaded."""
+        return self.rdkit_mol.GetNumAtoms() if self.rdkit_mol else 0
+    
+    @property
+    def num_carbons(self) -> int:
+        """Number of carbon atoms in the molecule."""
+        return self._count_carbon_groups()[0]
+    
+    @property
+    def num_CH0_groups(self) -> int:
+        """Number of carbons without attached hydrogens, or -1 without a molecule."""
+        return self._count_carbon_groups()[1]
+    
+    @property
+    def num_CH1_groups(self) -> int:
+        """Number of CH carbons, or -1 without a molecule."""
+        return self._count_carbon_groups()[2]
+    
+    @property
+    def num_CH2_groups(self) -> int:
+        """Number of CH2 carbons, or -1 without a molecule."""
+        return self._count_carbon_groups()[3]
+    
+    @property
+    def num_CH3_groups(self) -> int:
+        """Number of CH3 carbons, or -1 without a molecule."""
+        return self._count_carbon_groups()[4]
+    
+    def _count_carbon_groups(self) -> Tuple[int, int, int, int, int]:
+        """
+        Count the carbons and the CH0-CH3 groups of the molecule.
+        
+        Returns:
+            Tuple of (carbons, CH0, CH1, CH2, CH3); the group counts are -1
+            when no molecule is loaded
+        """
+        if not self.rdkit_mol:
+            return 0, -1, -1, -1, -1
+        
+        # Count carbons by attached hydrogens from the cached atom properties
+        _, num_hs = self._get_atom_properties()
+        carbon_indices = self._get_carbon_indices()
+        ch_counts = [0, 0, 0, 0]
+        for atom_idx in carbon_indices:
+            n_h = num_hs[atom_idx]
+            if n_h < 4:
+                ch_counts[n_h] += 1
+        return (len(carbon_indices), *ch_counts)
+    
     def find_mol_files(self) -> List[Path]:
         """
         Find all .mol files in the directory.
@@ -100,7 +188,13 @@ class BrukerToJSONConverter:
         Returns:
             List of Path objects for found mol files
         """
-        self.mol_files = list(self.data_directory.glob("*.mol"))
+        try:
+            with os.scandir(self.data_directory) as entries:
+                self.mol_files = [Path(entry.path) for entry in entries
+                                  if entry.name.lower().endswith(".mol") and entry.is_file()]
+        except OSError:
+            # Missing or unreadable directory: no mol files, as Path.glob would report
+            self.mol_files = []
         print(f"Found {len(self.mol_files)} mol file(s): {[f.name for f in self.mol_files]}")
         return self.mol_files
     
@@ -114,6 +208,9 @@ class BrukerToJSONConverter:
         Returns:
             Path to selected mol file or None if no files found
         """
+        # An explicit selection replaces the automatic one made on first use
+        self._mol_files_processed = True
+        
         if not self.mol_files:
             self.find_mol_files()
         
@@ -136,6 +233,9 @@ class BrukerToJSONConverter:
         Returns:
             True if successful, False otherwise
         """
+        # An explicit load replaces the automatic one made on first use
+        self._mol_files_processed = True
+        
         if not RDKIT_AVAILABLE:
             print("RDKit not available. Cannot process mol files.")
             return False
@@ -145,19 +245,18 @@ class BrukerToJSONConverter:
             return False
         
         try:
-            # Read the mol file content as text
-            with open(self.selected_mol_file, 'r', encoding='utf-8') as f:
-                self.molfile_content = f.read()
+            # Read the mol file content in one go; normalise Windows line endings
+            self._molfile_content = self.selected_mol_file.read_bytes().decode('utf-8').replace('\r\n', '\n')
             
-            # Load with RDKit
-            self.rdkit_mol = Chem.MolFromMolFile(str(self.selected_mol_file))
+            # Load with RDKit from the content already in memory
+            self._rdkit_mol = Chem.MolFromMolBlock(self._molfile_content)
             
-            if self.rdkit_mol is None:
+            if self._rdkit_mol is None:
                 print(f"Failed to parse mol file: {self.selected_mol_file}")
                 return False
             
             print(f"Successfully loaded mol file: {self.selected_mol_file.name}")
-            print(f"Molecule has {self.rdkit_mol.GetNumAtoms()} atoms")
+            print(f"Molecule has {self._rdkit_mol.GetNumAtoms()} atoms")
             return True
             
         except Exception as e:
@@ -171,24 +270,25 @@ class BrukerToJSONConverter:
         Returns:
             SMILES string or empty string if not available
         """
-        if not RDKIT_AVAILABLE or not self.rdkit_mol:
-            return self.smiles or ""
+        mol = self.rdkit_mol
+        if not RDKIT_AVAILABLE or not mol:
+            return self._smiles or ""
         
         try:
-            generated_smiles = Chem.MolToSmiles(self.rdkit_mol)
+            generated_smiles = Chem.MolToSmiles(mol)
             print(f"Generated SMILES from mol file: {generated_smiles}")
             
             # Use generated SMILES if no SMILES was provided
-            if not self.smiles:
-                self.smiles = generated_smiles
-            elif self.smiles != generated_smiles:
-                print(f"Note: Provided SMILES ({self.smiles}) differs from generated SMILES ({generated_smiles})")
+            if not self._smiles:
+                self._smiles = generated_smiles
+            elif self._smiles != generated_smiles:
+                print(f"Note: Provided SMILES ({self._smiles}) differs from generated SMILES ({generated_smiles})")
                 print("Using provided SMILES.")
             
-            return self.smiles
+            return self._smiles
         except Exception as e:
             print(f"Error generating SMILES: {e}")
-            return self.smiles or ""
+            return self._smiles or ""
     
     def _process_mol_files(self) -> None:
         """Process mol files in the directory."""
@@ -200,6 +300,16 @@ class BrukerToJSONConverter:
             if self.load_mol_file():
                 self.generate_smiles_from_mol()
     
+    def _ensure_mol_files_processed(self) -> None:
+        """Find and load the directory's mol file once, unless a molecule was already set."""
+        if self._mol_files_processed:
+            return
+        self._mol_files_processed = True
+        
+        # Process mol file if available and RDKit is installed
+        if RDKIT_AVAILABLE and self._rdkit_mol is None:
+            self._process_mol_files()
+    
     def convert_to_json(self, user_expt_selections: Dict[str, Dict], 
                        ml_consent: bool = False, 
                        simulated_annealing: bool = False) -> Dict[str, Any]:
@@ -217,6 +327,12 @@ class BrukerToJSONConverter:
         # Clear any existing data
         self.json_data = {}
         
+        # Snapshot the experiment metadata used by the spectrum builders
+        self._expt_summaries, self._peak_expt_ids, self._exp_identifiers = self._summarize_experiments()
+        
+        # Load the mol file, which may supply the SMILES and molfile content
+        self._ensure_mol_files_processed()
+        
         # Add basic molecular information
         self._add_molecular_info()
         
@@ -244,42 +360,19 @@ class BrukerToJSONConverter:
     def _add_molecular_info(self) -> None:
         """Add SMILES and molfile information to JSON."""
         if self.smiles:
-            self.json_data["smiles"] = {
-                "datatype": "smiles",
-                "count": 1,
-                "data": {"0": self.smiles}
-            }
+            self.json_data["smiles"] = self._scalar_entry("smiles", self.smiles)
         
         if self.molfile_content:
-            self.json_data["molfile"] = {
-                "datatype": "molfile",
-                "count": 1,
-                "data": {"0": self.molfile_content}
-            }
+            self.json_data["molfile"] = self._scalar_entry("molfile", self.molfile_content)
     
     def _add_system_info(self) -> None:
         """Add system and hostname information."""
-        # Generate hardware-based ID
-        hostname = hex(uuid.getnode())
-        
-        self.json_data["hostname"] = {
-            "datatype": "hostname",
-            "count": 1,
-            "data": {"0": hostname}
-        }
+        self.json_data["hostname"] = self._scalar_entry("hostname", MACHINE_ID)
         
         # Add working directory and filename
-        self.json_data["workingDirectory"] = {
-            "datatype": "workingDirectory",
-            "count": 1,
-            "data": {"0": str(self.data_directory.absolute()).replace("\\", "/")}
-        }
+        self.json_data["workingDirectory"] = self._scalar_entry("workingDirectory", self._working_directory)
         
-        self.json_data["workingFilename"] = {
-            "datatype": "workingFilename",
-            "count": 1,
-            "data": {"0": self.data_directory.name}
-        }
+        self.json_data["workingFilename"] = self._scalar_entry("workingFilename", self._working_filename)
     
     def _add_atom_info(self) -> None:
         """Add atom information from mol file or placeholders."""
@@ -316,6 +409,39 @@ class BrukerToJSONConverter:
             "data": {}
         }
     
+    def _get_atom_properties(self) -> Tuple[List[str], List[int]]:
+        """
+        Get atom symbols and total hydrogen counts from the RDKit molecule.
+        
+        The atoms are traversed once per molecule and cached.
+        
+        Returns:
+            Tuple of (symbols, hydrogen counts) indexed by atom position
+        """
+        if self._atom_cache is None or self._atom_cache[0] is not self.rdkit_mol:
+            symbols = []
+            num_hs = []
+            carbon_indices = []
+            for atom_idx, atom in enumerate(self.rdkit_mol.GetAtoms()):
+                symbol = atom.GetSymbol()
+                symbols.append(symbol)
+                num_hs.append(atom.GetTotalNumHs())
+                if symbol == 'C':
+                    carbon_indices.append(atom_idx)
+            self._atom_cache = (self.rdkit_mol, symbols, num_hs, carbon_indices)
+        
+        return self._atom_cache[1], self._atom_cache[2]
+    
+    def _get_carbon_indices(self) -> List[int]:
+        """
+        Get the positions of the carbon atoms in the RDKit molecule.
+        
+        Returns:
+            List of atom indices, in atom order, whose symbol is 'C'
+        """
+        self._get_atom_properties()
+        return self._atom_cache[3]
+    
     def _create_all_atoms_info_from_mol(self) -> Dict[str, Any]:
         """
         Create the allAtomsInfo structure from the RDKit molecule.
@@ -332,15 +458,17 @@ class BrukerToJSONConverter:
             "count": self.rdkit_mol.GetNumAtoms()
         }
         
-        for atom_idx, atom in enumerate(self.rdkit_mol.GetAtoms()):
+        symbols, num_hs = self._get_atom_properties()
+        atom_keys = list(map(str, range(len(symbols) + 1)))
+        for atom_idx, (symbol, num_protons) in enumerate(zip(symbols, num_hs)):
             atom_info = {
                 "atom_idx": atom_idx,
                 "id": atom_idx,
-                "atomNumber": str(atom_idx + 1),  # 1-based numbering as string
-                "symbol": atom.GetSymbol(),
-                "numProtons": atom.GetTotalNumHs()
+                "atomNumber": atom_keys[atom_idx + 1],  # 1-based numbering as string
+                "symbol": symbol,
+                "numProtons": num_protons
             }
-            all_atoms_data["data"][str(atom_idx)] = atom_info
+            all_atoms_data["data"][atom_keys[atom_idx]] = atom_info
         
         return all_atoms_data
     
@@ -360,20 +488,20 @@ class BrukerToJSONConverter:
             "count": 0
         }
         
-        carbon_count = 0
-        for atom_idx, atom in enumerate(self.rdkit_mol.GetAtoms()):
-            if atom.GetSymbol() == 'C':
-                atom_info = {
-                    "atom_idx": atom_idx,
-                    "id": atom_idx,
-                    "atomNumber": str(atom_idx + 1),  # 1-based numbering as string
-                    "symbol": "C",
-                    "numProtons": atom.GetTotalNumHs()
-                }
-                carbon_atoms_data["data"][str(atom_idx)] = atom_info
-                carbon_count += 1
-        
-        carbon_atoms_data["count"] = carbon_count
+        symbols, num_hs = self._get_atom_properties()
+        carbon_indices = self._get_carbon_indices()
+        atom_keys = list(map(str, range(len(symbols) + 1)))
+        for atom_idx in carbon_indices:
+            atom_info = {
+                "atom_idx": atom_idx,
+                "id": atom_idx,
+                "atomNumber": atom_keys[atom_idx + 1],  # 1-based numbering as string
+                "symbol": "C",
+                "numProtons": num_hs[atom_idx]
+            }
+            carbon_atoms_data["data"][atom_keys[atom_idx]] = atom_info
+        
+        carbon_atoms_data["count"] = len(carbon_indices)
         return carbon_atoms_data
     
     def _add_nmr_spectra(self, user_expt_selections: Dict[str, Dict]) -> None:
@@ -384,8 +512,7 @@ class BrukerToJSONConverter:
             user_expt_selections: Dictionary mapping experiment IDs to their settings
         """
         chosen_spectra = []
-        spectrum_counter = 0
-        experiment_identifiers = []
+        exp_type_counts = Counter()
         
         for expt_id, expt_selection_values in user_expt_selections.items():
             exp_type = expt_selection_values.get("experimentType", "Unknown")
@@ -401,17 +528,16 @@ class BrukerToJSONConverter:
                 print(f"Warning: No data found for experiment {expt_id}")
                 continue
             
-            pulseprogram = expt_data.get("pulseprogram", "unknown")
-            nuclei = expt_data.get("nuclei", ["Unknown"])
-            dimensions = expt_data.get("dimensions", 1)
+            summary = self._expt_summaries.get(expt_id) or self._summarize_experiment(expt_data)
+            nuclei, dimensions, pulseprogram, _ = summary
             
             # Create spectrum identifier
-            exp_type_count = experiment_identifiers.count(exp_type)
-            experiment_identifiers.append(exp_type)
+            exp_type_count = exp_type_counts[exp_type]
+            exp_type_counts[exp_type] += 1
             spectrum_id = f"{exp_type}_{exp_type_count}"
             
             # Create spectrum entry
-            spectrum_data = self._create_spectrum_entry(expt_data, spectrum_id, procno)
+            spectrum_data = self._create_spectrum_entry(expt_data, spectrum_id, procno, summary)
             
             # Add to main JSON data
             self.json_data[spectrum_id] = spectrum_data
@@ -424,29 +550,44 @@ class BrukerToJSONConverter:
             
             chosen_entry = f"{nucleus_str} {dimensions}D {pulseprogram} {spectrum_id} {exp_type}"
             chosen_spectra.append(chosen_entry)
-            
-            spectrum_counter += 1
         
         # Add chosen spectra to JSON
-        self.json_data["chosenSpectra"] = {
-            "datatype": "chosenSpectra",
-            "count": len(chosen_spectra),
-            "data": {str(i): spec for i, spec in enumerate(chosen_spectra)}
-        }
+        self.json_data["chosenSpectra"] = self._list_entry("chosenSpectra", chosen_spectra)
+        
+        # Add experiment identifiers (collected by _summarize_experiments)
+        self.json_data["exptIdentifiers"] = self._list_entry("exptIdentifiers", self._exp_identifiers)
+    
+    @staticmethod
+    def _summarize_experiment(expt_data: Dict[str, Any]) -> _ExperimentSummary:
+        """Get (nuclei, dimensions, pulseprogram, experimentType) for an experiment."""
+        return _ExperimentSummary(
+            expt_data.get("nuclei", ["Unknown"]),
+            expt_data.get("dimensions", 1),
+            expt_data.get("pulseprogram", "unknown"),
+            expt_data.get("experimentType", "Unknown")
+        )
+    
+    def _summarize_experiments(self) -> Tuple[Dict[str, _ExperimentSummary], List[str], List[str]]:
+        """
+        Summarize every experiment in the Bruker data in a single pass.
         
-        # Add experiment identifiers
+        Returns:
+            Tuple of (summaries by experiment ID, IDs of experiments with peaks,
+            experiment identifiers with "SKIP" for unidentified experiments)
+        """
+        summaries = {}
+        peak_expt_ids = []
         exp_identifiers = []
         for expt_id, expt_data in self.bruker_data.items():
-            exp_type = expt_data.get("experimentType", "SKIP")
-            exp_identifiers.append(exp_type)
-        
-        self.json_data["exptIdentifiers"] = {
-            "count": len(exp_identifiers),
-            "datatype": "exptIdentifiers",
-            "data": {str(i): exp_id for i, exp_id in enumerate(exp_identifiers)}
-        }
+            summaries[expt_id] = self._summarize_experiment(expt_data)
+            if expt_data.get('haspeaks', False):
+                peak_expt_ids.append(expt_id)
+            exp_type = expt_data.get("experimentType")
+            exp_identifiers.append("SKIP" if exp_type is None else exp_type)
+        return summaries, peak_expt_ids, exp_identifiers
     
-    def _create_spectrum_entry(self, expt_data: Dict[str, Any], spectrum_id: str, procno: str) -> Dict[str, Any]:
+    def _create_spectrum_entry(self, expt_data: Dict[str, Any], spectrum_id: str, procno: str,
+                               summary: Optional[_ExperimentSummary] = None) -> Dict[str, Any]:
         """
         Create a spectrum entry in the JSON format.
         
@@ -454,13 +595,12 @@ class BrukerToJSONConverter:
             expt_data: Experiment data dictionary
             spectrum_id: Unique identifier for the spectrum
             procno: Processing number
+            summary: Optional precomputed experiment summary (see _summarize_experiment)
             
         Returns:
             Dictionary containing spectrum data
         """
-        nuclei = expt_data.get("nuclei", ["Unknown"])
-        dimensions = expt_data.get("dimensions", 1)
-        exp_type = expt_data.get("experimentType", "Unknown")
+        nuclei, dimensions, pulseprogram, exp_type = summary or self._summarize_experiment(expt_data)
         
         # Get acquisition parameters
         acqu = expt_data.get("acqu", {})
@@ -476,7 +616,7 @@ class BrukerToJSONConverter:
             "experiment": exp_type if exp_type != "Unknown" else "1D",
             "class": "",
             "spectype": "",
-            "pulsesequence": expt_data.get("pulseprogram", "unknown"),
+            "pulsesequence": pulseprogram,
             "intrument": "Avance",  # Default, could be extracted from acqu
             "probe": self._get_probe_info(acqu),
             "datafilename": str(expt_data.get("path", "")),
@@ -485,13 +625,16 @@ class BrukerToJSONConverter:
             "temperature": self._get_temperature(acqu)
         }
         
+        # Processed data for the chosen procno
+        proc_data = expt_data.get("pdata", {}).get(procno, {})
+        
         # Add peaks from peaklist if available
-        peaks_data = self._get_peaks_data(expt_data, procno, dimensions)
+        peaks_data = self._get_peaks_data(proc_data, dimensions)
         spectrum_entry["peaks"] = peaks_data
         
         # Add integrals for 2D experiments
         if dimensions == 2:
-            integrals_data = self._get_integrals_data(expt_data, procno)
+            integrals_data = self._get_integrals_data(proc_data)
             spectrum_entry["integrals"] = integrals_data
         else:
             spectrum_entry["integrals"] = {"datatype": "integrals", "count": 0, "normValue": 1, "data": {}}
@@ -563,26 +706,20 @@ class BrukerToJSONConverter:
             bf2 = acqu2.get("BF1", 0.0) if (acqu2 and hasattr(acqu2, 'get')) else 0.0
             return f"[{bf2}, {bf1}]"
     
-    def _get_peaks_data(self, expt_data: Dict[str, Any], procno: str, dimensions: int) -> Dict[str, Any]:
-        """Get peaks data from experiment."""
-        pdata = expt_data.get("pdata", {})
-        proc_data = pdata.get(procno, {})
-        
-        if "peaklist" in proc_data and hasattr(proc_data["peaklist"], 'empty'):
-            if not proc_data["peaklist"].empty:
-                return self._convert_peaklist_to_json(proc_data["peaklist"], dimensions)
+    def _get_peaks_data(self, proc_data: Dict[str, Any], dimensions: int) -> Dict[str, Any]:
+        """Get peaks data from a processed data folder."""
+        peaklist = proc_data.get("peaklist")
+        if hasattr(peaklist, 'empty') and not peaklist.empty:
+            return self._convert_peaklist_to_json(peaklist, dimensions)
         
         # Return empty peaks structure
         return {"datatype": "peaks", "data": {}, "count": 0}
     
-    def _get_integrals_data(self, expt_data: Dict[str, Any], procno: str) -> Dict[str, Any]:
-        """Get integrals data for 2D experiments."""
-        pdata = expt_data.get("pdata", {})
-        proc_data = pdata.get(procno, {})
-        
-        if "integrals" in proc_data and hasattr(proc_data["integrals"], 'empty'):
-            if not proc_data["integrals"].empty:
-                return self._convert_2d_integrals_to_json(proc_data["integrals"])
+    def _get_integrals_data(self, proc_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Get integrals data for 2D experiments from a processed data folder."""
+        integrals = proc_data.get("integrals")
+        if hasattr(integrals, 'empty') and not integrals.empty:
+            return self._convert_2d_integrals_to_json(integrals)
         
         # Return empty integrals structure
         return {"datatype": "integrals", "count": 0, "normValue": 1, "data": {}}
@@ -591,22 +728,27 @@ class BrukerToJSONConverter:
         """Convert pandas DataFrame peaklist to JSON format."""
         peaks_data = {"datatype": "peaks", "data": {}, "count": len(peaklist_df)}
         
-        for idx, row in peaklist_df.iterrows():
-            peak_entry = {
-                "intensity": float(row.get("intensity", 0.0)),
+        if "annotation" in peaklist_df.columns:
+            # str() per value: astype(str) leaves missing values as NaN under pandas 3
+            annotation = [str(a) for a in peaklist_df["annotation"].tolist()]
+        else:
+            annotation = [""] * len(peaklist_df)
+        
+        if dimensions == 1:
+            rows = self._numeric_rows(peaklist_df, ["intensity", "ppm"])
+        else:
+            rows = self._numeric_rows(peaklist_df, ["intensity", "f1_ppm", "f2_ppm"])
+        
+        keys = map(str, peaklist_df.index.tolist())
+        for key, ann, row in zip(keys, annotation, rows):
+            peaks_data["data"][key] = {
+                "intensity": row[0],
                 # "type": int(row.get("type", 0)),
                 "type": 0,
-                "annotation": str(row.get("annotation", ""))
+                "annotation": ann,
+                "delta1": row[1],
+                "delta2": row[2] if dimensions != 1 else 0
             }
-            
-            if dimensions == 1:
-                peak_entry["delta1"] = float(row.get("ppm", 0.0))
-                peak_entry["delta2"] = 0
-            else:
-                peak_entry["delta1"] = float(row.get("f1_ppm", 0.0))
-                peak_entry["delta2"] = float(row.get("f2_ppm", 0.0))
-            
-            peaks_data["data"][str(idx)] = peak_entry
         
         return peaks_data
     
@@ -622,114 +764,97 @@ class BrukerToJSONConverter:
             "data": {}
         }
         
-        for idx, row in integrals_df.iterrows():
-            integral_entry = {
-                "intensity": float(row.get("integral", 0.0)),
-                "rangeMin1": float(row.get("F1_row2_ppm", 0.0)),  # F1 dimension min
-                "rangeMin2": float(row.get("F2_col1_ppm", 0.0)),  # F2 dimension min
-                "rangeMax1": float(row.get("F1_row1_ppm", 0.0)),  # F1 dimension max
-                "rangeMax2": float(row.get("F2_col2_ppm", 0.0)),  # F2 dimension max
-                "delta1": float(row.get("f1_ppm", 0.0)),          # F1 center
-                "delta2": float(row.get("f2_ppm", 0.0)),          # F2 center
+        rows = self._numeric_rows(integrals_df, [
+            "integral",
+            "F1_row2_ppm",  # F1 dimension min
+            "F2_col1_ppm",  # F2 dimension min
+            "F1_row1_ppm",  # F1 dimension max
+            "F2_col2_ppm",  # F2 dimension max
+            "f1_ppm",       # F1 center
+            "f2_ppm"        # F2 center
+        ])
+        
+        keys = map(str, integrals_df.index.tolist())
+        for key, (integral, min1, min2, max1, max2, d1, d2) in zip(keys, rows):
+            integrals_data["data"][key] = {
+                "intensity": integral,
+                "rangeMin1": min1,
+                "rangeMin2": min2,
+                "rangeMax1": max1,
+                "rangeMax2": max2,
+                "delta1": d1,
+                "delta2": d2,
                 "type": 0
             }
-            
-            integrals_data["data"][str(idx)] = integral_entry
         
         return integrals_data
     
+    @staticmethod
+    def _numeric_rows(df, columns: List[str], default: float = 0.0) -> List[List[float]]:
+        """
+        Extract numeric DataFrame columns as rows of Python floats.
+        
+        The columns are converted together into a single float64 block, with
+        missing columns filled with the default value.
+        """
+        return df.reindex(columns=columns, fill_value=default).to_numpy(dtype=np.float64).tolist()
+    
     def _add_experiment_settings(self) -> None:
         """Add experiment-specific settings."""
         # Add spectra with peaks
         spectra_with_peaks = []
-        for expt_id, expt_data in self.bruker_data.items():
-            if expt_data.get('haspeaks', False):
-                nuclei = expt_data.get("nuclei", ["Unknown"])
-                dimensions = expt_data.get("dimensions", 1)
-                pulseprogram = expt_data.get("pulseprogram", "unknown")
-                exp_type = expt_data.get("experimentType", "Unknown")
-                
-                if dimensions == 1:
-                    nucleus_str = f"{nuclei[0]} 1D"
-                else:
-                    nucleus_str = f"[{', '.join(nuclei)}] {exp_type}"
-                
-                spectrum_name = f"{nucleus_str} {pulseprogram} {expt_id}.{'fid' if dimensions == 1 else 'ser'}_0"
-                spectra_with_peaks.append(spectrum_name)
-        
-        self.json_data["spectraWithPeaks"] = {
-            "datatype": "spectraWithPeaks",
-            "count": len(spectra_with_peaks),
-            "data": {str(i): spec for i, spec in enumerate(spectra_with_peaks)}
-        }
+        for expt_id in self._peak_expt_ids:
+            nuclei, dimensions, pulseprogram, exp_type = self._expt_summaries[expt_id]
+            
+            if dimensions == 1:
+                nucleus_str = f"{nuclei[0]} 1D"
+            else:
+                nucleus_str = f"[{', '.join(nuclei)}] {exp_type}"
+            
+            spectrum_name = f"{nucleus_str} {pulseprogram} {expt_id}.{'fid' if dimensions == 1 else 'ser'}_0"
+            spectra_with_peaks.append(spectrum_name)
+        
+        self.json_data["spectraWithPeaks"] = self._list_entry("spectraWithPeaks", spectra_with_peaks)
+    
+    @staticmethod
+    def _index_dict(items: List[Any]) -> Dict[str, Any]:
+        """Map list items to their string indices ("0", "1", ...)."""
+        return dict(zip(map(str, range(len(items))), items))
+    
+    @classmethod
+    def _list_entry(cls, datatype: str, items: List[Any]) -> Dict[str, Any]:
+        """Create a JSON entry holding a list of values."""
+        return {"datatype": datatype, "count": len(items), "data": cls._index_dict(items)}
+    
+    @staticmethod
+    def _scalar_entry(datatype: str, value: Any) -> Dict[str, Any]:
+        """Create a single-valued JSON entry."""
+        return {"datatype": datatype, "count": 1, "data": {"0": value}}
     
     def _add_processing_parameters(self) -> None:
         """Add processing and calculation parameters."""
-        # Default processing parameters
-        self.json_data["carbonCalcPositionsMethod"] = {
-            "datatype": "carbonCalcPositionsMethod",
-            "count": 1,
-            "data": {"0": "Calculated Positions"}
-        }
-        
-        self.json_data["MNOVAcalcMethod"] = {
-            "datatype": "MNOVAcalcMethod",
-            "count": 1,
-            "data": {"0": "NMRSHIFTDB2 Predict"}
-        }
-        
-        # Default simulated annealing parameters
-        self.json_data["randomizeStart"] = {
-            "datatype": "randomizeStart",
-            "count": 1,
-            "data": {"0": False}
-        }
-        
-        self.json_data["startingTemperature"] = {
-            "datatype": "startingTemperature",
-            "count": 1,
-            "data": {"0": 1000}
-        }
-        
-        self.json_data["endingTemperature"] = {
-            "datatype": "endingTemperature",
-            "count": 1,
-            "data": {"0": 0.1}
-        }
-        
-        self.json_data["coolingRate"] = {
-            "datatype": "coolingRate",
-            "count": 1,
-            "data": {"0": 0.999}
-        }
-        
-        self.json_data["numberOfSteps"] = {
-            "datatype": "numberOfSteps",
-            "count": 1,
-            "data": {"0": 10000}
-        }
-        
-        self.json_data["ppmGroupSeparation"] = {
-            "datatype": "ppmGroupSeparation",
-            "count": 1,
-            "data": {"0": 2}
-        }
+        default_parameters = (
+            # Default processing parameters
+            ("carbonCalcPositionsMethod", "Calculated Positions"),
+            ("MNOVAcalcMethod", "NMRSHIFTDB2 Predict"),
+            # Default simulated annealing parameters
+            ("randomizeStart", False),
+            ("startingTemperature", 1000),
+            ("endingTemperature", 0.1),
+            ("coolingRate", 0.999),
+            ("numberOfSteps", 10000),
+            ("ppmGroupSeparation", 2),
+        )
+        for datatype, value in default_parameters:
+            self.json_data[datatype] = self._scalar_entry(datatype, value)
     
     def _add_ml_consent(self, ml_consent: bool) -> None:
         """Add ML consent information."""
-        self.json_data["ml_consent"] = {
-            "datatype": "ml_consent",
-            "count": 1,
-            "data": {"0": ml_consent}
-        }
+        self.json_data["ml_consent"] = self._scalar_entry("ml_consent", ml_consent)
     
     def _add_simulated_annealing(self, simulated_annealing: bool) -> None:
         """Add simulated annealing information."""
-        self.json_data["simulatedAnnealing"] = {
-            "datatype": "simulatedAnnealing",
-            "count": 1,
-            "data": {"0": simulated_annealing}
-        }
+        self.json_data["simulatedAnnealing"] = self._scalar_entry("simulatedAnnealing", simulated_annealing)
     
     def save_json(self, output_path: Union[str, Path]) -> None:
         """
@@ -739,10 +864,30 @@ class BrukerToJSONConverter:
             output_path: Path where to save the JSON file
         """
         output_path = Path(output_path)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            json.dump(self.json_data, f, indent=4, ensure_ascii=False)
+        # Serialize in memory first so the file is written in a single call
+        # rather than in the many small chunks json.dump would produce
+        output_path.write_bytes(self.get_json_bytes())
         print(f"JSON data saved to: {output_path}")
     
+    def get_json_bytes(self, compact: bool = False) -> bytes:
+        """
+        Get the JSON data as UTF-8 encoded bytes.
+        
+        Args:
+            compact: If True, encode without indentation (e.g. for a request
+                     body); otherwise format it for reading
+        
+        Returns:
+            JSON document as bytes
+        """
+        if compact:
+            if ORJSON_AVAILABLE:
+                return orjson.dumps(self.json_data, option=_ORJSON_OPTIONS)
+            return json.dumps(self.json_data).encode('utf-8')
+        if ORJSON_AVAILABLE:
+            return orjson.dumps(self.json_data, option=_ORJSON_OPTIONS | orjson.OPT_INDENT_2)
+        return json.dumps(self.json_data, indent=4, ensure_ascii=False).encode('utf-8')
+    
     def get_json_string(self, indent: int = 4) -> str:
         """
         Get the JSON data as a formatted string.
@@ -753,6 +898,9 @@ class BrukerToJSONConverter:
         Returns:
             JSON string
         """
+        # orjson only supports two-space indentation
+        if ORJSON_AVAILABLE and indent == 2:
+            return orjson.dumps(self.json_data, option=_ORJSON_OPTIONS | orjson.OPT_INDENT_2).decode('utf-8')
         return json.dumps(self.json_data, indent=indent, ensure_ascii=False)
 
 
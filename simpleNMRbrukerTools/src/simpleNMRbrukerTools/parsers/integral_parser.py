@@ -1,8 +1,33 @@
 """
 bruker_nmr/src/parsers/integral_parser.py
 """
+import numpy as np
 import pandas as pd
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
+
+# Columns of the F1 and F2 lines of an integral record
+_F1_DTYPE = np.dtype([
+    ('integral_num', np.int64),
+    ('F1_SI', np.int64),
+    ('F1_row1', np.int64),
+    ('F1_row2', np.int64),
+    ('F1_row1_ppm', np.float64),
+    ('F1_row2_ppm', np.float64),
+    ('abs_intensity', np.float64),
+    ('integral', np.float64),
+    ('mode', object),
+])
+_F2_DTYPE = np.dtype([
+    ('F2_SI', np.int64),
+    ('F2_col1', np.int64),
+    ('F2_col2', np.int64),
+    ('F2_col1_ppm', np.float64),
+    ('F2_col2_ppm', np.float64),
+])
+
+# Split no further than the fields used; any trailing fields stay in one remainder
+_F1_MAXSPLIT = len(_F1_DTYPE)
+_F2_MAXSPLIT = len(_F2_DTYPE)
 
 
 def parse_bruker_2d_integral(file_content: str) -> pd.DataFrame:
@@ -21,16 +46,19 @@ def parse_bruker_2d_integral(file_content: str) -> pd.DataFrame:
     if data_start is None:
         raise ValueError("Could not find data section in file")
     
-    data = _parse_integral_data(lines, data_start)
-    df = pd.DataFrame(data)
+    df = _parse_integral_columns(lines, data_start)
+    if df is None:
+        # Malformed values: use the line-by-line parser, which skips bad lines
+        df = pd.DataFrame(_parse_integral_data(lines, data_start))
     
     if not df.empty:
         # Add center point calculations
         df['f1_ppm'] = (df['F1_row1_ppm'] + df['F1_row2_ppm']) / 2
         df['f2_ppm'] = (df['F2_col1_ppm'] + df['F2_col2_ppm']) / 2
         
-        # Sort by f2_ppm descending
-        df = df.sort_values(by='f2_ppm', ascending=False).reset_index(drop=True)
+        # Sort by f2_ppm descending; a stable sort keeps equal shifts in file order
+        order = np.argsort(-df['f2_ppm'].to_numpy(), kind='stable')
+        df = df.iloc[order].reset_index(drop=True)
     
     return df
 
@@ -43,6 +71,45 @@ def _find_data_start(lines: List[str]) -> int:
     return None
 
 
+def _parse_integral_columns(lines: List[str], start_index: int) -> Optional[pd.DataFrame]:
+    """
+    Parse the integral data by pairing F1/F2 lines and converting each column in bulk.
+    
+    Returns:
+        DataFrame of integrals, or None if a value fails to convert
+    """
+    f1_lines = []
+    f2_lines = []
+    n_lines = len(lines)
+    i = start_index + 1
+    
+    while i < n_lines:
+        parts = lines[i].split(None, _F1_MAXSPLIT)
+        if len(parts) >= 9 and parts[0].isdigit() and parts[1] == '1024' and i + 1 < n_lines:
+            f2_parts = lines[i + 1].split(None, _F2_MAXSPLIT)
+            if len(f2_parts) >= 5 and f2_parts[0] == '1024':
+                f1_lines.append(lines[i])
+                f2_lines.append(lines[i + 1])
+                i += 2
+                continue
+        i += 1
+    
+    if not f1_lines:
+        return pd.DataFrame([])
+    
+    # Every paired line has at least the 9 (F1) / 5 (F2) fields used; extra fields are ignored
+    try:
+        f1 = np.loadtxt(f1_lines, dtype=_F1_DTYPE, usecols=range(len(_F1_DTYPE)), comments=None, ndmin=1)
+        f2 = np.loadtxt(f2_lines, dtype=_F2_DTYPE, usecols=range(len(_F2_DTYPE)), comments=None, ndmin=1)
+    except ValueError:
+        return None
+    
+    data = {name: f1[name] for name in _F1_DTYPE.names}
+    data['mode'] = data['mode'].tolist()
+    data.update((name, f2[name]) for name in _F2_DTYPE.names)
+    return pd.DataFrame(data)
+
+
 def _parse_integral_data(lines: List[str], start_index: int) -> List[Dict[str, Any]]:
     """Parse the integral data from lines."""
     data = []
@@ -78,7 +145,7 @@ def _parse_integral_data(lines: List[str], start_index: int) -> List[Dict[str, A
 
 def _parse_f1_line(line: str) -> Dict[str, Any]:
     """Parse F1 dimension line."""
-    parts = line.split()
+    parts = line.split(None, _F1_MAXSPLIT)
     if len(parts) >= 9 and parts[0].isdigit() and parts[1] == '1024':
         try:
             return {
@@ -99,7 +166,7 @@ def _parse_f1_line(line: str) -> Dict[str, Any]:
 
 def _parse_f2_line(line: str) -> Dict[str, Any]:
     """Parse F2 dimension line."""
-    parts = line.split()
+    parts = line.split(None, _F2_MAXSPLIT)
     if len(parts) >= 5 and parts[0] == '1024':
         try:
             return {
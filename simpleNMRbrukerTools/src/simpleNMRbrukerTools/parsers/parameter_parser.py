@@ -159,9 +159,29 @@
 """
 bruker_nmr/src/core/parameter_parser.py
 """
+import mmap
+import os
 import re
 from pathlib import Path
-from typing import Dict, Any, Union
+from typing import Dict, Any, Optional, Union
+
+import numpy as np
+
+# Patterns used for every parameter line, compiled once
+# A parameter line (leading whitespace allowed): ##$NAME= value
+_PARAM_LINE_RE = re.compile(r'^[^\S\n]*##\$([^=\n]+)=([^\n]*)', re.MULTILINE)
+# Array values: the following lines up to a ##$, $$, ##END or blank line
+_ARRAY_VALUES_RE = re.compile(r'(?:\n(?![^\S\n]*(?:##\$|\$\$|##END|\n|\Z))[^\n]*)*')
+# Line boundaries other than '\n' that splitlines() recognises
+_LINE_BREAK_RE = re.compile('[\r\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029]')
+_BASE_NAME_RE = re.compile(r'([^(]+)')
+# Files larger than this are decoded straight from a memory map instead of read into a bytes copy
+_MMAP_THRESHOLD = 32_768
+# Whole array values made only of ints, or only of floats (every token has a '.' or exponent).
+# ASCII digits only: np.fromstring rejects the other Unicode digits int()/float() accept
+_INT_ARRAY_RE = re.compile(r'-?[0-9]{1,18}(?: -?[0-9]{1,18})*')
+_FLOAT_TOKEN = r'-?(?:(?:[0-9]+\.[0-9]*|\.[0-9]+)(?:[eE][-+]?[0-9]+)?|[0-9]+[eE][-+]?[0-9]+)'
+_FLOAT_ARRAY_RE = re.compile(rf'{_FLOAT_TOKEN}(?: {_FLOAT_TOKEN})*')
 
 
 class BrukerParameterFile:
@@ -171,110 +191,92 @@ class BrukerParameterFile:
     Attributes:
         file_path (Path): Path to the parameter file
         parameters (Dict[str, Any]): Parsed parameters
-        raw_content (str): Raw file content
+        raw_content (str): Raw file content, read from disk on access
     """
     
-    def __init__(self, file_path: Union[str, Path]):
+    def __init__(self, file_path: Union[str, Path], content: Optional[bytes] = None):
         """
         Initialize parser with parameter file.
         
         Args:
             file_path: Path to Bruker parameter file
+            content: File content already read from file_path; if given, the
+                file is not opened again
             
         Raises:
             FileNotFoundError: If parameter file doesn't exist
         """
         self.file_path = Path(file_path)
         self.parameters = {}
-        self.raw_content = ""
         
-        if not self.file_path.exists():
+        if content is None and not self.file_path.exists():
             raise FileNotFoundError(f"Parameter file not found: {file_path}")
         
-        self._parse_file()
+        self._parse_file(content)
     
-    def _parse_file(self) -> None:
-        """Parse the parameter file and extract all parameters."""
-        with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
-            self.raw_content = f.read()
+    @classmethod
+    def from_parameters(cls, file_path: Union[str, Path], parameters: Dict[str, Any]) -> 'BrukerParameterFile':
+        """
+        Create a parameter file from parameters parsed earlier.
         
-        lines = self.raw_content.split('\n')
-        i = 0
+        The parameters are copied, so changes to the new object don't affect
+        the parameters it was created from.
         
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            if self._should_skip_line(line):
-                i += 1
-                continue
+        Args:
+            file_path: Path to Bruker parameter file
+            parameters: Parsed parameters, as in the parameters attribute
             
-            if line.startswith('##$'):
-                param_name, value, i = self._parse_parameter(lines, i)
-                if param_name:
-                    self.parameters[param_name] = value
-            else:
-                i += 1
-    
-    def _should_skip_line(self, line: str) -> bool:
-        """Check if line should be skipped during parsing."""
-        return (line.startswith('$$') or 
-                line.startswith('##END') or 
-                not line)
-    
-    def _parse_parameter(self, lines: list, start_index: int) -> tuple:
-        """
-        Parse a single parameter that may span multiple lines.
-        
         Returns:
-            tuple: (param_name, value, next_index)
+            BrukerParameterFile for file_path
         """
-        line = lines[start_index].strip()
-        
-        match = re.match(r'##\$([^=]+)=\s*(.*)', line)
-        if not match:
-            return None, None, start_index + 1
-        
-        param_name = match.group(1)
-        value_str = match.group(2)
-        
-        # Handle array parameters
-        if self._is_array_parameter(value_str):
-            array_values, next_index = self._parse_array_values(lines, start_index)
-            base_name = re.match(r'([^(]+)', param_name).group(1)
-            return base_name, array_values, next_index
-        
-        # Single value parameter
-        parsed_value = self._convert_value(value_str)
-        return param_name, parsed_value, start_index + 1
+        param_file = cls.__new__(cls)
+        param_file.file_path = Path(file_path)
+        param_file.parameters = {name: list(value) if isinstance(value, list) else value
+                                 for name, value in parameters.items()}
+        return param_file
+    
+    def _parse_file(self, content: Optional[bytes] = None) -> None:
+        """Parse the parameter file (or its content, if given) and extract all parameters."""
+        # Only the parameters are kept; the raw text is not held for the object's lifetime
+        if content is not None:
+            text = content.decode('utf-8', 'ignore')
+        else:
+            with open(self.file_path, 'rb') as f:
+                if os.fstat(f.fileno()).st_size > _MMAP_THRESHOLD:
+                    with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                        text = str(mm, 'utf-8', 'ignore')
+                else:
+                    text = f.read().decode('utf-8', 'ignore')
+        
+        if _LINE_BREAK_RE.search(text):
+            # Reduce every line boundary splitlines() recognises to '\n'
+            text = '\n'.join(text.splitlines())
+        
+        # Each match is a ##$NAME= line; lines in between are only read as array values
+        for match in _PARAM_LINE_RE.finditer(text):
+            param_name, value_str = match.groups()
+            
+            if self._is_array_parameter(value_str):
+                array_text = _ARRAY_VALUES_RE.match(text, match.end()).group()
+                base_name = _BASE_NAME_RE.match(param_name).group(1)
+                self.parameters[base_name] = self._parse_array_values(array_text.split())
+            else:
+                self.parameters[param_name] = self._convert_value(value_str)
     
     def _is_array_parameter(self, param_name: str) -> bool:
         """Check if parameter is an array type."""
         return '(' in param_name and ')' in param_name
     
-    def _parse_array_values(self, lines: list, start_index: int) -> tuple:
-        """Parse array values that may span multiple lines."""
-        values = []
-        i = start_index + 1  # Skip the parameter definition line
-        
-        # Continue reading lines until we hit another parameter or end
-        while i < len(lines):
-            line = lines[i].strip()
-            
-            # Stop if we hit another parameter, comment, or end
-            if (line.startswith('##$') or 
-                line.startswith('$$') or 
-                line.startswith('##END') or
-                not line):
-                break
-            
-            # Split the line and add values
-            line_values = line.split()
-            values.extend(line_values)
-            i += 1
-        
-        # Convert all values to appropriate types
-        converted_values = [self._convert_value(v) for v in values]
-        return converted_values, i
+    def _parse_array_values(self, values: list) -> list:
+        """Convert the value tokens of an array parameter."""
+        # Convert all values to appropriate types, in one numpy call when the
+        # array is all ints or all floats
+        joined = ' '.join(values)
+        if _INT_ARRAY_RE.fullmatch(joined):
+            return np.fromstring(joined, dtype=np.int64, sep=' ').tolist()
+        if _FLOAT_ARRAY_RE.fullmatch(joined):
+            return np.fromstring(joined, dtype=np.float64, sep=' ').tolist()
+        return [self._convert_value(v) for v in values]
     
     def _convert_value(self, value_str: str) -> Union[str, int, float, bool]:
         """Convert string value to appropriate Python type."""
@@ -300,6 +302,12 @@ class BrukerParameterFile:
         except ValueError:
             return value_str
     
+    @property
+    def raw_content(self) -> str:
+        """Raw file content, re-read from disk since it is rarely needed."""
+        with open(self.file_path, 'r', encoding='utf-8', errors='ignore') as f:
+            return f.read()
+    
     # Dictionary-like interface
     def get(self, key: str, default: Any = None) -> Any:
         """Get parameter value with default."""
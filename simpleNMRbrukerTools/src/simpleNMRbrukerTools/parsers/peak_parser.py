@@ -1,51 +1,102 @@
 """
 bruker_nmr/src/parsers/peak_parser.py
 """
-import xml.etree.ElementTree as ET
+import io
+import numpy as np
 import pandas as pd
-from typing import Literal
+from typing import BinaryIO, Literal, Union
 
+# Optional lxml import for faster XML parsing
+try:
+    from lxml import etree as ET
+    LXML_AVAILABLE = True
+except ImportError:
+    import xml.etree.ElementTree as ET
+    LXML_AVAILABLE = False
 
-def parse_peak_xml(xml_content: str, peak_type: Literal['Peak1D', 'Peak2D'] = 'Peak2D') -> pd.DataFrame:
+
+def parse_peak_xml(xml_content: Union[str, bytes, BinaryIO], peak_type: Literal['Peak1D', 'Peak2D'] = 'Peak2D') -> pd.DataFrame:
     """
     Parse Bruker peak XML file to DataFrame.
     
     Args:
-        xml_content: XML content as string
+        xml_content: XML content as string, the raw bytes of the file, or a
+            binary file object open on it
         peak_type: Type of peaks to parse ('Peak1D' or 'Peak2D')
         
     Returns:
         DataFrame with peak data
+        
+    Raises:
+        ValueError: If a peak lacks one of its position, intensity or type attributes
     """
-    root = ET.fromstring(xml_content)
-    peaks = root.findall(f'.//{peak_type}')
+    # A str is already decoded, so any encoding declared in it must not be applied again
+    encoding = None
+    if isinstance(xml_content, str):
+        if LXML_AVAILABLE:
+            # lxml only parses bytes; override the declared encoding to match
+            xml_content = io.BytesIO(xml_content.encode('utf-8'))
+            encoding = 'utf-8'
+        else:
+            xml_content = io.StringIO(xml_content)
+    elif isinstance(xml_content, bytes):
+        xml_content = io.BytesIO(xml_content)
+    
+    # Pull the peaks out as the document is parsed, clearing each element once
+    # its attributes are read so the tree never holds the whole peak list
+    if LXML_AVAILABLE:
+        events = ET.iterparse(xml_content, events=('end',), tag=peak_type, encoding=encoding)
+    else:
+        events = ET.iterparse(xml_content, events=('end',))
+    
+    f1_values, f2_values, intensities, peak_types, annotation = [], [], [], [], []
+    for _, peak in events:
+        if peak.tag != peak_type:
+            continue
+        f1_values.append(peak.get('F1'))
+        f2_values.append(peak.get('F2'))
+        intensities.append(peak.get('intensity'))
+        peak_types.append(peak.get('type'))
+        annotation.append(peak.get('annotation', ''))
+        peak.clear()
+    
+    required = [('F1', f1_values), ('intensity', intensities), ('type', peak_types)]
+    if peak_type == 'Peak2D':
+        required.append(('F2', f2_values))
+    for attribute, values in required:
+        if None in values:
+            raise ValueError(f"{peak_type} element without a {attribute} attribute")
+    
+    # Convert each attribute column straight into a typed array
+    f1 = np.array(f1_values, dtype=np.float64)
+    intensity = np.array(intensities, dtype=np.float64)
+    types = np.array(peak_types, dtype=np.int64)
+    
+    if peak_type == 'Peak2D':
+        f2 = np.array(f2_values, dtype=np.float64)
+        sort_key = f2
+    else:  # Peak1D
+        sort_key = f1
+    
+    # Order the columns before building the DataFrame: descending ppm, with a
+    # stable sort so that equal shifts keep their file order
+    order = np.argsort(-sort_key, kind='stable')
+    annotation = [annotation[i] for i in order.tolist()]
     
     if peak_type == 'Peak2D':
-        data = [
-            {
-                'f1_ppm': float(peak.get('F1')),
-                'f2_ppm': float(peak.get('F2')),
-                'annotation': peak.get('annotation', ''),
-                'intensity': float(peak.get('intensity')),
-                'type': int(peak.get('type'))
-            }
-            for peak in peaks
-        ]
-        sort_col = 'f2_ppm'
+        data = {
+            'f1_ppm': f1[order],
+            'f2_ppm': f2[order],
+            'annotation': annotation,
+            'intensity': intensity[order],
+            'type': types[order]
+        }
     else:  # Peak1D
-        data = [
-            {
-                'ppm': float(peak.get('F1')),
-                'intensity': float(peak.get('intensity')),
-                'type': int(peak.get('type')),
-                'annotation': peak.get('annotation', ''),
-            }
-            for peak in peaks
-        ]
-        sort_col = 'ppm'
-    
-    df = pd.DataFrame(data)
-    if not df.empty:
-        df = df.sort_values(by=sort_col, ascending=False).reset_index(drop=True)
-    
-    return df
\ No newline at end of file
+        data = {
+            'ppm': f1[order],
+            'intensity': intensity[order],
+            'type': types[order],
+            'annotation': annotation,
+        }
+    
+    return pd.DataFrame(data)
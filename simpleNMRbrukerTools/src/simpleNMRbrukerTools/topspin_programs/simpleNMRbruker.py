@@ -13,16 +13,16 @@ Dependencies:
 Usage:
     python main_gui.py
 """
-# import os
+import os
 import sys
 import json
-import uuid
+import time
+import functools
 # import socket
 import requests
-import webbrowser
 from pathlib import Path
 # from typing import Dict, List, Optional, Any
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
 import threading
 from qtpy.QtWidgets import QProgressDialog, QApplication, QMessageBox
 from qtpy.QtCore import Qt
@@ -38,7 +38,17 @@ SERVERADDRESSPYTHONANYWHERE = "https://test-simplenmr.pythonanywhere.com/"
 
 SERVERADDRESS = SERVERADDRESSPYTHONANYWHERE
 
-from simpleNMRbrukerTools.core.json_converter import BrukerToJSONConverter
+# A positive registration check is cached locally so the server is not queried on every launch
+REGISTRATION_CACHE_FILE = Path.home() / ".simplenmr" / "registration.json"
+REGISTRATION_CACHE_TTL = 24 * 60 * 60  # seconds
+REGISTRATION_TIMEOUT = 10  # seconds
+
+# Shared read-only default for missing nested dicts, so lookups don't allocate a new {}
+_EMPTY = {}
+
+_http_session = None
+
+from simpleNMRbrukerTools.core.json_converter import BrukerToJSONConverter, MACHINE_ID
 # from simpleNMRbrukerTools.core.data_reader import BrukerDataDirectory  
 # from simpleNMRbrukerTools.config import EXPERIMENT_CONFIGS
 
@@ -65,58 +75,143 @@ class BrukerFolderDialog(DataSet):
     bruker_folder = DirectoryItem("Bruker Data Folder", default=".")
 
 
-def create_processing_dialog(experiments_with_peaks: Dict[str, List], converter):
+def create_processing_dialog(experiments_with_peaks: Dict[str, Tuple[str, List, str]], converter):
     """
     Dynamically create a processing dialog based on available experiments.
     
     Args:
-        experiments_with_peaks: Dictionary mapping experiment IDs to available processing folders
+        experiments_with_peaks: Dictionary mapping experiment IDs to
+                                (experiment type, processing folders, dialog attribute name)
         converter: BrukerToJSONConverter instance
         
     Returns:
         DataSet class for the processing dialog
     """
-    class Processing(gds.DataSet):
-        """Choose Spectra"""
+    dialog_shape = tuple(
+        (expt_id, experiment_type, tuple(folder_name for _, folder_name in proc_files), attr_name)
+        for expt_id, (experiment_type, proc_files, attr_name) in experiments_with_peaks.items()
+    )
+    return _build_processing_dialog(dialog_shape)
+
+
+@functools.lru_cache(maxsize=32)
+def _build_processing_dialog(dialog_shape: Tuple[Tuple[str, str, Tuple[str, ...], str], ...]):
+    """
+    Build the processing dialog class for a given set of experiments.
+    
+    Cached on dialog_shape, so re-opening the same data folder reuses the class.
+    
+    Args:
+        dialog_shape: (experiment ID, experiment type, processing folder names, attribute name)
+                      per experiment
         
-        _experiment_choices = {}
+    Returns:
+        DataSet class for the processing dialog
+    """
+    experiment_choices = {}
+    experiment_options = {}
+    
+    for expt_id, experiment_type, proc_names, attr_name in dialog_shape:
+        procnumbers = proc_names + ("SKIP",)
+
+        experiment_choices[attr_name] = gdi.ChoiceItem(f"{expt_id} {experiment_type}", list(procnumbers))
+        # Keep the plain option list so selections can be resolved without guidata props
+        experiment_options[attr_name] = procnumbers
+
+    attrs = {
+        "__doc__": "Choose Spectra",
+        "_experiment_choices": experiment_choices,
+        "_experiment_options": experiment_options,
+        **experiment_choices,
+        "simulated_annealing": gdi.BoolItem("Optimize Correlations", 
+                                            default=True,
+                                            help="Enable simulated annealing of COSY and HMBC correlations for structure optimization"),
+        "ml_consent": gdi.BoolItem("Permit Data to be saved to build Database", 
+                                   default=False,
+                                   help="Allow your data to contribute to improving NMR prediction models"),
+    }
+    
+    return type("Processing", (gds.DataSet,), attrs)
+
+
+def get_http_session() -> requests.Session:
+    """Get the shared HTTP session so connections to the server are reused."""
+    global _http_session
+    if _http_session is None:
+        _http_session = requests.Session()
+    return _http_session
+
+
+def read_cached_registration(machine_id: str, ttl: float = REGISTRATION_CACHE_TTL) -> bool:
+    """
+    Check for a recent cached 'registered' verdict for this machine.
+    
+    Args:
+        machine_id: MAC address based machine ID
+        ttl: Maximum age of the cached verdict in seconds
         
-        for expt_id, proc_files in experiments_with_peaks.items():
-            expt_data = converter.bruker_data[expt_id]
-            experiment_type = expt_data.get('experimentType', 'Unknown')
-            if experiment_type == "Unknown":
-                continue
-            
-            procnumbers = [proc_file.name for proc_file in proc_files]
-            procnumbers.append("SKIP")
-            print(expt_id, procnumbers)
+    Returns:
+        True if a fresh 'registered' verdict is cached, False otherwise
+    """
+    try:
+        with open(REGISTRATION_CACHE_FILE, 'r', encoding='utf-8') as f:
+            cached = json.load(f)
+    except (OSError, ValueError):
+        return False
+    
+    if not isinstance(cached, dict):
+        return False
+    
+    # A timestamp that is not a number, or lies in the future, counts as no
+    # cache so the server is asked again
+    timestamp = cached.get("timestamp")
+    if isinstance(timestamp, bool) or not isinstance(timestamp, (int, float)):
+        return False
+    
+    return (cached.get("hostname") == machine_id and
+            cached.get("status") == "registered" and
+            0 <= time.time() - timestamp < ttl)
 
-            _experiment_choices[f"expt_{expt_id}"] = (gdi.ChoiceItem(f"{expt_id} {experiment_type}", procnumbers))
-            locals()[f"expt_{expt_id}"] = _experiment_choices[f"expt_{expt_id}"]
 
-        simulated_annealing = gdi.BoolItem("Optimize Correlations", 
-                                           default=True,
-                                           help="Enable simulated annealing of COSY and HMBC correlations for structure optimization")
-        ml_consent = gdi.BoolItem("Permit Data to be saved to build Database", 
-                                  default=False,
-                                  help="Allow your data to contribute to improving NMR prediction models")
+def write_cached_registration(machine_id: str) -> None:
+    """
+    Cache a 'registered' verdict for this machine.
     
-    return Processing
- 
+    Args:
+        machine_id: MAC address based machine ID
+    """
+    try:
+        REGISTRATION_CACHE_FILE.parent.mkdir(parents=True, exist_ok=True)
+        tmp_file = REGISTRATION_CACHE_FILE.with_suffix(".tmp")
+        with open(tmp_file, 'w', encoding='utf-8') as f:
+            json.dump({"hostname": machine_id, "status": "registered", "timestamp": time.time()}, f)
+        os.replace(tmp_file, REGISTRATION_CACHE_FILE)
+    except OSError as e:
+        print(f"Could not cache registration status: {e}")
 
 
-def check_user_registration() -> bool:
+def check_user_registration(ttl: float = REGISTRATION_CACHE_TTL) -> bool:
     """
     Check if the user's machine is registered for the service.
     
+    A 'registered' verdict is cached for ttl seconds, so the server is only
+    contacted when there is no fresh cached verdict.
+    
+    Args:
+        ttl: Maximum age of a cached registration in seconds
+        
     Returns:
         True if user can proceed, False otherwise
     """
     try:
-        # Generate machine ID (MAC address based)
-        mac_based_id = hex(uuid.getnode())
+        # Machine ID (MAC address based)
+        mac_based_id = MACHINE_ID
         print(f"Machine ID: {mac_based_id}")
         
+        if read_cached_registration(mac_based_id, ttl):
+            print("Machine registration cached. Proceeding...")
+            return True
+        
         # Prepare request
         json_obj = {"hostname": mac_based_id}
         # entry_point = "https://test-simplenmr.pythonanywhere.com/check_machine_learning"
@@ -125,11 +220,11 @@ def check_user_registration() -> bool:
         print("Checking user registration...")
         
         # Make the POST request
-        response = requests.post(
+        response = get_http_session().post(
             entry_point,
             headers={'Content-Type': 'application/json'},
             json=json_obj,
-            timeout=100
+            timeout=REGISTRATION_TIMEOUT
         )
         
         print(f"Registration check response: {response.status_code}")
@@ -148,6 +243,7 @@ def check_user_registration() -> bool:
                 print("Machine is unregistered. Opening registration page...")
                 registration_url = response_data.get("registration_url", "")
                 if registration_url:
+                    import webbrowser
                     webbrowser.open(registration_url)
                 else:
                     print("No registration URL provided.")
@@ -156,6 +252,7 @@ def check_user_registration() -> bool:
             
             elif isinstance(status, str) and status.strip().lower() == "registered":
                 print("Machine is registered. Proceeding...")
+                write_cached_registration(mac_based_id)
                 return True
             
             elif isinstance(status, bool) and not status:
@@ -179,7 +276,7 @@ def check_user_registration() -> bool:
     return False
 
 
-def find_experiments_with_peaks(converter) -> Dict[str, List]:
+def find_experiments_with_peaks(converter) -> Dict[str, Tuple[str, List, str]]:
     """
     Find experiments that have peak data available.
     
@@ -187,20 +284,22 @@ def find_experiments_with_peaks(converter) -> Dict[str, List]:
         converter: BrukerToJSONConverter instance
         
     Returns:
-        Dictionary mapping experiment IDs to lists of processing folders with peaks
+        Dictionary mapping experiment IDs to (experiment type, processing folders with peaks,
+        dialog attribute name), where each processing folder is a (folder, folder name) pair
     """
     experiments_with_peaks = {}
     
     # Handle both original and refactored data structures
     if hasattr(converter, 'bruker_data'):
-        # Refactored structure
-        data_dict = converter.bruker_data.data if hasattr(converter.bruker_data, 'data') else converter.bruker_data
+        # Refactored structure; iterate the reader itself so peak lists are loaded
+        data_dict = converter.bruker_data
     else:
         # Original structure
         data_dict = converter._all_bruker_folders
     
     for expt_id, expt_data in data_dict.items():
-        if not expt_data.get('haspeaks', False):
+        # Cheapest test first: most experiments without peaks stop at the haspeaks flag
+        if not expt_data.get('haspeaks'):
             continue
             
         experiment_type = expt_data.get('experimentType', 'Unknown')
@@ -208,27 +307,29 @@ def find_experiments_with_peaks(converter) -> Dict[str, List]:
             continue
         
         # Find processing folders with peaks
-        pdata = expt_data.get('pdata', {})
+        pdata = expt_data.get('pdata') or _EMPTY
+        procfolders = pdata.get('procfolders')
         proc_folders_with_peaks = []
         
         # Handle different pdata structures
-        if 'procfolders' in pdata:
+        if procfolders is not None:
             # Refactored structure
-            for folder in pdata.get('procfolders', []):
+            for folder in procfolders:
                 folder_name = folder.name if hasattr(folder, 'name') else str(folder)
-                proc_data = pdata.get(folder_name, {})
                 
-                if proc_data.get('haspeaks', False):
-                    proc_folders_with_peaks.append(folder)
+                if (pdata.get(folder_name) or _EMPTY).get('haspeaks'):
+                    proc_folders_with_peaks.append((folder, folder_name))
         else:
             # Original structure - check for numbered folders
             for key, value in pdata.items():
                 if key != 'path' and isinstance(value, dict):
                     if value.get('haspeaks', False):
-                        proc_folders_with_peaks.append(key)
+                        proc_folders_with_peaks.append((key, key))
         
         if proc_folders_with_peaks:
-            experiments_with_peaks[expt_id] = proc_folders_with_peaks
+            # Interned so the dialog's class dict and later getattr lookups share one string
+            attr_name = sys.intern(f"expt_{expt_id}")
+            experiments_with_peaks[expt_id] = (experiment_type, proc_folders_with_peaks, attr_name)
             print(f"Found experiment {expt_id} ({experiment_type}) with {len(proc_folders_with_peaks)} processed datasets")
     
     return experiments_with_peaks
@@ -240,7 +341,7 @@ def process_user_selections(dialog_instance, experiments_with_peaks: Dict, conve
     
     Args:
         dialog_instance: Instance of the ProcessingDialog
-        experiments_with_peaks: Available experiments
+        experiments_with_peaks: Available experiments, as returned by find_experiments_with_peaks
         converter: BrukerToJSONConverter instance
         
     Returns:
@@ -248,47 +349,69 @@ def process_user_selections(dialog_instance, experiments_with_peaks: Dict, conve
     """
     user_selections = {}
     
-    # Handle both data structures
-    if hasattr(converter, 'bruker_data'):
-        data_dict = converter.bruker_data.data if hasattr(converter.bruker_data, 'data') else converter.bruker_data
-    else:
-        data_dict = converter._all_bruker_folders
-    
-    for expt_id in experiments_with_peaks.keys():
-        expt_data = data_dict[expt_id]
-        experiment_type = expt_data.get('experimentType', 'Unknown')
+    # Unknown experiment types were already filtered out by find_experiments_with_peaks
+    # The dialog was built from the same experiments, so every expt_<id> attribute exists
+    experiment_options = dialog_instance._experiment_options
+    for expt_id, (experiment_type, _, attr_name) in experiments_with_peaks.items():
+        selected_index = getattr(dialog_instance, attr_name)
         
-        if experiment_type == "Unknown":
-            continue
+        # Option list cached when the dialog was built
+        choices = experiment_options[attr_name]
         
-        attr_name = f"expt_{expt_id}"
-        if hasattr(dialog_instance, attr_name):
-            selected_index = getattr(dialog_instance, attr_name)
+        # Convert index to actual choice text
+        if 0 <= selected_index < len(choices):
+            selected_choice = choices[selected_index]
             
-            # Get the choice item to access the options
-            choice_item = dialog_instance._experiment_choices[attr_name]
-            choices = choice_item.get_prop("data", "choices")
+            print(f"User selected: {expt_id} ({experiment_type}) -> {selected_choice}")
             
-            # Convert index to actual choice text
-            if 0 <= selected_index < len(choices):
-                selected_choice = choices[selected_index][1]  # choices is list of (value, label) tuples
-                
-                print(f"User selected: {expt_id} ({experiment_type}) -> {selected_choice}")
-                
-                if selected_choice != "SKIP":
-                    user_selections[expt_id] = {
-                        "experimentType": experiment_type,
-                        "procno": selected_choice
-                    }
+            if selected_choice != "SKIP":
+                user_selections[expt_id] = {
+                    "experimentType": experiment_type,
+                    "procno": selected_choice
+                }
     
     return user_selections
 
-def submit_to_server(json_data: Dict) -> bool:
+def stream_response_to_file(response, output_path: Path, placeholder: bytes, replacement: bytes,
+                            chunk_size: int = 1 << 16) -> None:
+    """
+    Write a streamed HTTP response body to a file, replacing a placeholder on the way.
+    
+    The body is copied chunk by chunk as bytes rather than decoded into one
+    string first. Up to len(placeholder) - 1 unmatched bytes from the end of
+    each chunk are held back so a placeholder split across two chunks is
+    still replaced; substituted text is never held back, so it is not
+    searched again.
+    
+    Args:
+        response: requests.Response opened with stream=True
+        output_path: File to write
+        placeholder: Bytes to replace in the body
+        replacement: Bytes to substitute for the placeholder
+        chunk_size: Size of the chunks read from the response
+    """
+    keep = len(placeholder) - 1
+    pending = b""
+    with open(output_path, 'wb') as f:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            parts = (pending + chunk).split(placeholder)
+            tail = parts.pop()
+            split_at = max(len(tail) - keep, 0)
+            if parts:
+                f.write(replacement.join(parts) + replacement)
+            f.write(tail[:split_at])
+            pending = tail[split_at:]
+        f.write(pending)
+
+
+def submit_to_server(json_data: Dict, payload: Optional[bytes] = None) -> bool:
     """
     Submit the JSON data to the processing server with progress dialog.
     
     Args:
         json_data: The converted JSON data
+        payload: json_data already encoded as compact JSON bytes (e.g. from
+                 get_json_bytes(compact=True)); encoded here if not given
         
     Returns:
         True if successful, False otherwise
@@ -304,48 +427,50 @@ def submit_to_server(json_data: Dict) -> bool:
     # Variables to store result
     result = {'success': False, 'error': None, 'finished': False}
     
+    if payload is None:
+        payload = json.dumps(json_data).encode('utf-8')
+    
     def make_request():
         try:
             print("Submitting data to simpleNMR server...")
             
-            response = requests.post(
+            with get_http_session().post(
                 SERVERADDRESS + 'simpleMNOVA',
                 headers={'Content-Type': 'application/json'},
-                json=json_data,
-                timeout=100
-            )
-            
-            print(f"Server response: {response.status_code}")
+                data=payload,
+                timeout=100,
+                stream=True
+            ) as response:
             
-            if response.status_code == 200:
-                # replace dummy_title in response.txt with working_filename from json_data
-                workingFilename = json_data["workingFilename"]["data"].get("0", "nmr_analysis_result")
-                response_text = response.text
-                response_text = response_text.replace("dummy_title", workingFilename)
+                print(f"Server response: {response.status_code}")
                 
-                # Save response to file
-                fn_str = json_data["workingDirectory"]["data"].get("0", ".") 
-                fn_path = Path(fn_str, "html")
+                if response.status_code == 200:
+                    # replace dummy_title in the response with working_filename from json_data
+                    workingFilename = json_data["workingFilename"]["data"].get("0", "nmr_analysis_result")
+                    
+                    # Save response to file
+                    fn_str = json_data["workingDirectory"]["data"].get("0", ".") 
+                    fn_path = Path(fn_str, "html")
 
-                if not fn_path.exists():
-                    fn_path.mkdir(parents=True, exist_ok=True)
+                    if not fn_path.exists():
+                        fn_path.mkdir(parents=True, exist_ok=True)
 
-                # add filename to path
-                fn_path = Path(fn_path, workingFilename + ".html")
+                    # add filename to path
+                    fn_path = Path(fn_path, workingFilename + ".html")
 
-                with open(fn_path, 'w', encoding='utf-8') as f:
-                    f.write(response_text)
+                    stream_response_to_file(response, fn_path, b"dummy_title", workingFilename.encode('utf-8'))
 
-                print(f"Analysis complete! Results saved to '{fn_path}'")
+                    print(f"Analysis complete! Results saved to '{fn_path}'")
 
-                # Open in browser
-                webbrowser.open(f'file://{fn_path}' )
+                    # Open in browser
+                    import webbrowser
+                    webbrowser.open(f'file://{fn_path}' )
 
-                result['success'] = True
-            else:
-                error_msg = f"Server error: {response.status_code} - {response.text}"
-                print(error_msg)
-                result['error'] = error_msg
+                    result['success'] = True
+                else:
+                    error_msg = f"Server error: {response.status_code} - {response.text}"
+                    print(error_msg)
+                    result['error'] = error_msg
                 
         except requests.RequestException as e:
             error_msg = f"Network error: {e}"
@@ -418,11 +543,20 @@ def hsqc_present(user_selections):
             return True
     return False
 
-# Initialize QApplication for GUIDATA
-_app = guidata.qapplication()
+# QApplication for GUIDATA, created on first use rather than at import
+_app = None
+
+def get_qapplication():
+    """Create the QApplication needed by GUIDATA if it does not exist yet."""
+    global _app
+    if _app is None:
+        _app = guidata.qapplication()
+    return _app
 
 def main():
 
+    get_qapplication()
+
     top = Topspin()
     dp = top.getDataProvider()
     cdataset = dp.getCurrentDataset()
@@ -471,7 +605,7 @@ def main():
         converter = BrukerToJSONConverter(bruker_data_dir)
         # Handle both data structures
         if hasattr(converter, 'bruker_data'):
-            data_count = len(converter.bruker_data.data if hasattr(converter.bruker_data, 'data') else converter.bruker_data)
+            data_count = len(converter.bruker_data)
         else:
             data_count = len(converter._all_bruker_folders)
         print(f"Found {data_count} experiment folders")
@@ -482,6 +616,11 @@ def main():
         traceback.print_exc()
         return
     
+    if not data_count:
+        print("No experiment folders found.")
+        myGUIDATAwarn(f"No experiment folders found in {bruker_data_dir}")
+        return
+    
     # Step 3: Find experiments with peaks
     print("\n3. Finding Experiments with Peak Data...")
     experiments_with_peaks = find_experiments_with_peaks(converter)
@@ -496,10 +635,8 @@ def main():
     
     # check if hsqc expt found in experiments_with_peaks
     hsqc_with_peaks = False
-    for expt_id, proc_folders in experiments_with_peaks.items():
-        # find id in coverter
-        expt = converter.bruker_data[expt_id]
-        if expt["experimentType"] == "HSQC":
+    for expt_id, (experiment_type, proc_folders, _) in experiments_with_peaks.items():
+        if experiment_type == "HSQC":
             print(f"Found HSQC experiment in  {expt_id} with {len(proc_folders)} processing folders")
             hsqc_with_peaks = True
             break
@@ -584,7 +721,7 @@ def main():
 
     # Step 8: Submit to server for analysis
     print("\n7. Submitting to simpleNMR Server...")
-    if submit_to_server(json_data):
+    if submit_to_server(json_data, converter.get_json_bytes(compact=True)):
         print("Analysis complete! Check the opened browser window for results.")
     else:
         myGUIDATAwarn("Server submission failed")
@@ -606,6 +743,7 @@ if __name__ == "__main__":
         print("\n\nOperation cancelled by user.")
     except Exception as e:
         print(f"\nUnexpected error: {e}")
+        get_qapplication()
         myGUIDATAwarn(f"Unexpected error: \n {e}")
         import traceback
         traceback.print_exc()
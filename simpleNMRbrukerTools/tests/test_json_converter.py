@@ -7,6 +7,7 @@ import pytest
 import json
 import tempfile
 import shutil
+import pandas as pd
 from pathlib import Path
 from unittest.mock import Mock, patch, MagicMock
 
@@ -93,36 +94,26 @@ class TestBrukerToJSONConverter:
     
     @pytest.fixture
     def mock_peaklist_1d(self):
-        """Create mock 1D peaklist DataFrame."""
-        mock_df = Mock()
-        mock_df.empty = False
-        mock_df.__len__ = Mock(return_value=2)
-        mock_df.iterrows.return_value = [
-            (0, {"ppm": 7.26, "intensity": 1000.0, "type": 0, "annotation": "CHCl3"}),
-            (1, {"ppm": 2.50, "intensity": 800.0, "type": 1, "annotation": "DMSO"})
-        ]
-        return mock_df
+        """Create 1D peaklist DataFrame."""
+        return pd.DataFrame([
+            {"ppm": 7.26, "intensity": 1000.0, "type": 0, "annotation": "CHCl3"},
+            {"ppm": 2.50, "intensity": 800.0, "type": 1, "annotation": "DMSO"},
+            {"ppm": 1.25, "intensity": 500.0, "type": 0, "annotation": None}
+        ])
     
     @pytest.fixture
     def mock_peaklist_2d(self):
-        """Create mock 2D peaklist DataFrame."""
-        mock_df = Mock()
-        mock_df.empty = False
-        mock_df.__len__ = Mock(return_value=2)
-        mock_df.iterrows.return_value = [
-            (0, {"f1_ppm": 7.26, "f2_ppm": 77.2, "intensity": 1000.0, "type": 0, "annotation": ""}),
-            (1, {"f1_ppm": 2.50, "f2_ppm": 39.5, "intensity": 800.0, "type": 1, "annotation": ""})
-        ]
-        return mock_df
+        """Create 2D peaklist DataFrame."""
+        return pd.DataFrame([
+            {"f1_ppm": 7.26, "f2_ppm": 77.2, "intensity": 1000.0, "type": 0, "annotation": ""},
+            {"f1_ppm": 2.50, "f2_ppm": 39.5, "intensity": 800.0, "type": 1, "annotation": ""}
+        ])
     
     @pytest.fixture
     def mock_integrals_2d(self):
-        """Create mock 2D integrals DataFrame."""
-        mock_df = Mock()
-        mock_df.empty = False
-        mock_df.__len__ = Mock(return_value=1)
-        mock_df.iterrows.return_value = [
-            (0, {
+        """Create 2D integrals DataFrame."""
+        return pd.DataFrame([
+            {
                 "integral": 1000.0,
                 "F1_row1_ppm": 7.5,
                 "F1_row2_ppm": 7.0,
@@ -130,9 +121,8 @@ class TestBrukerToJSONConverter:
                 "F2_col2_ppm": 75.0,
                 "f1_ppm": 7.25,
                 "f2_ppm": 77.5
-            })
-        ]
-        return mock_df
+            }
+        ])
     
     @patch('bruker_nmr.src.core.json_converter.BrukerDataDirectory')
     def test_initialization(self, mock_bruker_class, mock_bruker_data, temp_directory):
@@ -218,7 +208,7 @@ M  END
         # Mock RDKit molecule
         mock_mol = Mock()
         mock_mol.GetNumAtoms.return_value = 3
-        mock_chem.MolFromMolFile.return_value = mock_mol
+        mock_chem.MolFromMolBlock.return_value = mock_mol
         
         with patch('bruker_nmr.src.core.json_converter.BrukerDataDirectory'):
             converter = BrukerToJSONConverter(temp_directory)
@@ -228,7 +218,7 @@ M  END
         assert result is True
         assert converter.molfile_content == mol_content
         assert converter.rdkit_mol == mock_mol
-        mock_chem.MolFromMolFile.assert_called_once_with(str(mol_file))
+        mock_chem.MolFromMolBlock.assert_called_once_with(mol_content)
     
     @patch('bruker_nmr.src.core.json_converter.RDKIT_AVAILABLE', False)
     def test_load_mol_file_rdkit_unavailable(self, temp_directory):
@@ -394,8 +384,8 @@ M  END
         peaks_data = converter._convert_peaklist_to_json(mock_peaklist_1d, 1)
         
         assert peaks_data["datatype"] == "peaks"
-        assert peaks_data["count"] == 2
-        assert len(peaks_data["data"]) == 2
+        assert peaks_data["count"] == 3
+        assert len(peaks_data["data"]) == 3
         
         # Check first peak
         peak_0 = peaks_data["data"]["0"]
@@ -403,6 +393,10 @@ M  END
         assert peak_0["delta2"] == 0
         assert peak_0["intensity"] == 1000.0
         assert peak_0["annotation"] == "CHCl3"
+        
+        # A missing annotation is still written as a string, never as NaN
+        assert isinstance(peaks_data["data"]["2"]["annotation"], str)
+        json.dumps(peaks_data, allow_nan=False)
     
     @patch('bruker_nmr.src.core.json_converter.BrukerDataDirectory')
     def test_convert_peaklist_2d(self, mock_bruker_class, mock_bruker_data, 
@@ -592,4 +586,5 @@ M  END
         )
         
         # Unknown experiments should be skipped
-        assert "Unknown_0
\ No newline at end of file
+        assert "Unknown_0" not in json_data
+        assert json_data["chosenSpectra"]["count"] == 0
@@ -85,6 +85,83 @@ class TestBrukerParameterFile:
             assert 'PULPROG' in parser.keys()
             
         Path(f.name).unlink()
+    
+    def test_comment_line_ends_array(self):
+        """Test that a $$ line inside an array ends its value."""
+        content = """##$P= (0..3)
+1 2
+$$ comment
+3 4
+##$NS= 16"""
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
+            f.write(content)
+            f.flush()
+            
+            parser = BrukerParameterFile(f.name)
+            
+            assert parser.get('P') == [1, 2]
+            assert parser.get('NS') == 16
+            
+        Path(f.name).unlink()
+    
+    def test_crlf_line_endings(self):
+        """Test parsing of files with CRLF line endings."""
+        content = """##$PULPROG= <zg30>
+##$P= (0..3)
+1 2
+3 4
+##$NS= 16"""
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt', newline='\r\n') as f:
+            f.write(content)
+            f.flush()
+            
+            parser = BrukerParameterFile(f.name)
+            
+            assert parser.get('PULPROG') == 'zg30'
+            assert parser.get('P') == [1, 2, 3, 4]
+            assert parser.get('NS') == 16
+            
+        Path(f.name).unlink()
+    
+    def test_array_termination(self):
+        """Test that blank lines and ##END end an array value."""
+        content = """##$P= (0..3)
+1 2
+
+3 4
+##$D= (0..3)
+0.5 1.5
+##END=
+2.5 3.5"""
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
+            f.write(content)
+            f.flush()
+            
+            parser = BrukerParameterFile(f.name)
+            
+            assert parser.get('P') == [1, 2]
+            assert parser.get('D') == [0.5, 1.5]
+            
+        Path(f.name).unlink()
+    
+    def test_indented_parameter_lines(self):
+        """Test that leading whitespace before ##$ is ignored."""
+        content = """  ##$NS= 16
+\t##$PULPROG= <zg30>"""
+        
+        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
+            f.write(content)
+            f.flush()
+            
+            parser = BrukerParameterFile(f.name)
+            
+            assert parser.get('NS') == 16
+            assert parser.get('PULPROG') == 'zg30'
+            
+        Path(f.name).unlink()
 
 
 """
@@ -183,6 +260,22 @@ class TestIntegralParser:
         
         with pytest.raises(ValueError, match="Could not find data section"):
             parse_bruker_2d_integral(content)
+    
+    def test_malformed_integral_line_skipped(self):
+        """Test that a malformed integral falls back to line parsing and is skipped."""
+        content = """# 2D integral file
+# SI_F1 data
+0 1024 100 200 7.5 6.5 1000.0 500.0 mode1
+1024 50 150 125.3 110.5
+1 1024 300 400 8.2 7.8 bad 600.0 mode2
+1024 75 175 140.2 130.1
+2 1024 300 400 8.2 7.8 1200.0 600.0 mode2
+1024 75 175 140.2 130.1"""
+        
+        df = parse_bruker_2d_integral(content)
+        
+        assert len(df) == 2
+        assert sorted(df['integral_num']) == [0, 2]
 
 
 """
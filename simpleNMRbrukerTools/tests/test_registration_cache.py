@@ -0,0 +1,62 @@
+"""
+tests/test_registration_cache.py
+"""
+import json
+import time
+import pytest
+
+# The TopSpin program only imports inside a TopSpin Python environment
+pytest.importorskip("bruker.api.topspin")
+pytest.importorskip("qtpy")
+pytest.importorskip("guidata")
+
+from simpleNMRbrukerTools.topspin_programs import simpleNMRbruker
+
+
+class TestRegistrationCache:
+
+    @pytest.fixture
+    def cache_file(self, tmp_path, monkeypatch):
+        """Point the registration cache at a temporary file."""
+        cache_file = tmp_path / "registration.json"
+        monkeypatch.setattr(simpleNMRbruker, "REGISTRATION_CACHE_FILE", cache_file)
+        return cache_file
+
+    def write_cache(self, cache_file, timestamp):
+        cache_file.write_text(json.dumps({
+            "hostname": "machine-1",
+            "status": "registered",
+            "timestamp": timestamp
+        }))
+
+    def test_fresh_cache(self, cache_file):
+        """Test that a fresh 'registered' verdict is used."""
+        self.write_cache(cache_file, time.time())
+
+        assert simpleNMRbruker.read_cached_registration("machine-1") is True
+        assert simpleNMRbruker.read_cached_registration("machine-2") is False
+
+    def test_expired_cache(self, cache_file):
+        """Test that an expired verdict is ignored."""
+        self.write_cache(cache_file, time.time() - 120)
+
+        assert simpleNMRbruker.read_cached_registration("machine-1", ttl=60) is False
+
+    def test_future_timestamp(self, cache_file):
+        """Test that a verdict stamped in the future is ignored."""
+        self.write_cache(cache_file, time.time() + 3600)
+
+        assert simpleNMRbruker.read_cached_registration("machine-1") is False
+
+    @pytest.mark.parametrize("timestamp", ["yesterday", None, [1]])
+    def test_corrupt_timestamp(self, cache_file, timestamp):
+        """Test that a non-numeric timestamp is ignored rather than raising."""
+        self.write_cache(cache_file, timestamp)
+
+        assert simpleNMRbruker.read_cached_registration("machine-1") is False
+
+    def test_corrupt_file(self, cache_file):
+        """Test that an unreadable cache file is ignored."""
+        cache_file.write_text("{not json")
+
+        assert simpleNMRbruker.read_cached_registration("machine-1") is False